@@ -0,0 +1,3 @@
+from backend.bench.suite import main
+
+main()
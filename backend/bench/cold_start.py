@@ -0,0 +1,92 @@
+"""
+Measure API cold start: import time, first-request latency and peak RSS per
+configuration, each in a fresh interpreter.
+
+Run from the project root:
+    python -m backend.bench.cold_start
+    python -m backend.bench.cold_start --no-disk-cache   # TF export needs Keras
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+HEAVY_MODULES = ("tensorflow", "keras", "shap", "xgboost", "sklearn", "scipy.stats")
+
+# name -> (modules imported before the app, env, requests after startup)
+CONFIGS = {
+    "import only": ([], {}, []),
+    "eager imports (previous layout)": (["keras", "shap", "sklearn.inspection", "xgboost"], {}, []),
+    "first xgboost request": ([], {}, ["/api/transactions?model=xgboost"]),
+    "first tensorflow request": ([], {}, ["/api/transactions?model=tensorflow"]),
+    "xgboost + SHAP": ([], {}, ["/api/transactions?model=xgboost", "/api/model/shap/TXN-00042?model=xgboost"]),
+    "FRAUD_WARM_MODELS=all": ([], {"FRAUD_WARM_MODELS": "all"}, []),
+}
+
+_CHILD = """
+import json, resource, sys, time, warnings
+warnings.simplefilter("ignore")
+start = time.perf_counter()
+for name in {preload!r}:
+    __import__(name)
+import backend.main
+from fastapi.testclient import TestClient
+imported = time.perf_counter()
+requests = []
+with TestClient(backend.main.app) as client:
+    started = time.perf_counter()
+    for url in {urls!r}:
+        t = time.perf_counter()
+        client.get(url).raise_for_status()
+        requests.append(round(time.perf_counter() - t, 3))
+print(json.dumps({{
+    "import_s": round(imported - start, 3),
+    "startup_s": round(started - imported, 3),
+    "requests_s": requests,
+    "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024),
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure(preload: list[str], env: dict, urls: list[str], disk_cache: bool) -> dict:
+    child_env = {**os.environ, **env, "TF_CPP_MIN_LOG_LEVEL": "3"}
+    if not disk_cache:
+        child_env["FRAUD_DISK_CACHE"] = "0"
+    code = _CHILD.format(preload=preload, urls=urls, heavy=HEAVY_MODULES)
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=child_env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--no-disk-cache", action="store_true",
+                        help="Disable the on-disk cache, as on a first deploy")
+    parser.add_argument("--json", action="store_true", help="Print raw results as JSON")
+    args = parser.parse_args()
+
+    results = {
+        name: measure(preload, env, urls, not args.no_disk_cache)
+        for name, (preload, env, urls) in CONFIGS.items()
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'configuration':<36} {'import s':>9} {'startup s':>10} {'requests s':>14} {'peak MB':>8}  loaded")
+    for name, r in results.items():
+        reqs = "/".join(str(s) for s in r["requests_s"]) or "-"
+        print(f"{name:<36} {r['import_s']:>9} {r['startup_s']:>10} {reqs:>14} {r['peak_rss_mb']:>8}  "
+              f"{', '.join(r['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
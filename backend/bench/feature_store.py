@@ -0,0 +1,90 @@
+"""
+Update and read throughput of the online per-card feature store.
+
+Streams random transactions over ``--cards`` distinct cards through
+``CardFeatureStore.update_many`` in batches, then reads the same number
+of events back with ``read_many``, and times a snapshot/restore.
+
+Run from the project root:
+    python -m backend.bench.feature_store --cards 1000000 5000000 --events 5000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from backend.ml.feature_store import CardFeatureStore
+
+
+def run(n_cards: int, n_events: int, batch_size: int) -> dict:
+    rng = np.random.default_rng(0)
+    store = CardFeatureStore()
+    # Events spread over a day, so buckets roll and cards recur
+    span = 86_400.0
+    # Touch every card once first so the steady state has n_cards live
+    warm = np.arange(n_cards)
+    start = time.perf_counter()
+    for i in range(0, n_cards, batch_size):
+        ids = warm[i:i + batch_size]
+        store.update_many(ids.tolist(), np.zeros(len(ids)), np.zeros(len(ids)), np.zeros(len(ids)))
+    load_seconds = time.perf_counter() - start
+
+    update_seconds = read_seconds = 0.0
+    for i in range(0, n_events, batch_size):
+        n = min(batch_size, n_events - i)
+        ids = rng.integers(0, n_cards, n).tolist()
+        ts = np.sort(rng.uniform(i / n_events * span, (i + n) / n_events * span, n))
+        lat = rng.uniform(-60, 60, n)
+        lon = rng.uniform(-180, 180, n)
+        t0 = time.perf_counter()
+        store.update_many(ids, ts, lat, lon)
+        t1 = time.perf_counter()
+        store.read_many(ids, ts, lat, lon)
+        read_seconds += time.perf_counter() - t1
+        update_seconds += t1 - t0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cards.npz")
+        t0 = time.perf_counter()
+        store.snapshot(path)
+        snapshot_seconds = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        restored = CardFeatureStore.restore(path)
+        restore_seconds = time.perf_counter() - t0
+    assert len(restored) == len(store)
+
+    return {
+        "cards": len(store),
+        "initial_load_per_sec": n_cards / load_seconds,
+        "updates_per_sec": n_events / update_seconds,
+        "reads_per_sec": n_events / read_seconds,
+        "memory_mb": store.memory_usage() / 2**20,
+        "snapshot_s": snapshot_seconds,
+        "restore_s": restore_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-card feature store.")
+    parser.add_argument("--cards", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'cards':>10} {'load/s':>12} {'updates/s':>12} {'reads/s':>12} "
+          f"{'memory':>10} {'snapshot':>9} {'restore':>9}")
+    for n in args.cards:
+        r = run(n, args.events, args.batch_size)
+        print(f"{r['cards']:>10,} {r['initial_load_per_sec']:>12,.0f} {r['updates_per_sec']:>12,.0f} "
+              f"{r['reads_per_sec']:>12,.0f} {r['memory_mb']:>8,.0f}MB "
+              f"{r['snapshot_s']:>8.2f}s {r['restore_s']:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark the /api/transactions response body: one pydantic model per row
+(the previous path) vs. orjson straight from the store's columns, and a
+cached body.
+
+Run from the project root:
+    python -m backend.bench.serialization --sizes 500 50000 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from starlette.responses import JSONResponse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from backend.data.generator import generate_transactions_vectorized
+from backend.data.store import TransactionStore
+from backend.schemas import Transaction, TransactionsResponse
+from backend.serialize import ResponseCache, dump_transactions
+
+FLAG_THRESHOLD = 0.6
+
+
+def pydantic_body(store: TransactionStore) -> bytes:
+    """What the router used to do, plus FastAPI's response_model pass."""
+    response = TransactionsResponse(
+        transactions=[Transaction(**t) for t in store.rows()],
+        total_fraud=int(store.columns["is_fraud"].sum()),
+        total=len(store),
+    )
+    # FastAPI re-validates the returned model against response_model,
+    # then renders the by-alias dump with json.dumps
+    validated = TransactionsResponse.model_validate(response)
+    return JSONResponse(validated.model_dump(mode="json", by_alias=True)).body
+
+
+def fast_body(store: TransactionStore) -> bytes:
+    return dump_transactions(
+        store, None, total_fraud=int(store.columns["is_fraud"].sum()), total=len(store)
+    )
+
+
+def best_of(fn, repeats: int) -> tuple[bytes, float]:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run(n: int, repeats: int) -> dict:
+    df = generate_transactions_vectorized(count=n, seed=42)
+    scores = np.round(np.random.default_rng(0).random(n), 3)
+    store = TransactionStore.from_frame(df, scores, flag_threshold=FLAG_THRESHOLD)
+
+    slow, slow_s = best_of(lambda: pydantic_body(store), 1 if n > 100_000 else repeats)
+    fast, fast_s = best_of(lambda: fast_body(store), repeats)
+    cache = ResponseCache(max_bytes=2**40)
+    cache.get_or_build(("bench", 1), lambda: fast)
+    _, cached_s = best_of(lambda: cache.get_or_build(("bench", 1), lambda: fast), repeats)
+
+    return {
+        "rows": n,
+        "payload_mb": round(len(fast) / 2**20, 2),
+        "identical": slow == fast,
+        "pydantic_ms": round(slow_s * 1000, 2),
+        "orjson_ms": round(fast_s * 1000, 2),
+        "cached_us": round(cached_s * 1e6, 2),
+        "speedup": round(slow_s / fast_s, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 50_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'MB':>8} {'pydantic ms':>12} {'orjson ms':>10} {'cached us':>10} {'speedup':>8}  identical")
+    for n in args.sizes:
+        r = run(n, args.repeats)
+        print(
+            f"{r['rows']:>10,} {r['payload_mb']:>8} {r['pydantic_ms']:>12} {r['orjson_ms']:>10} "
+            f"{r['cached_us']:>10} {r['speedup']:>7}x  {r['identical']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
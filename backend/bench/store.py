@@ -0,0 +1,119 @@
+"""
+Benchmark the columnar TransactionStore against the previous list-of-dicts
+dataset (built with DataFrame.iterrows).
+
+Run from the project root:
+    python -m backend.bench.store --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from backend.data.generator import generate_transactions
+from backend.data.store import TransactionStore
+
+FLAG_THRESHOLD = 0.6
+
+
+def build_dicts(df, scores) -> list[dict]:
+    """The pre-columnar dataset layout, kept here as the comparison point."""
+    txns = []
+    for _, row in df.iterrows():
+        score = scores[len(txns)]
+        txns.append({
+            "id": row["id"],
+            "amount": row["amount"],
+            "merchant": row["merchant"],
+            "city": row["city"],
+            "card_type": row["card_type"],
+            "hour": row["hour"],
+            "velocity": row["velocity"],
+            "dist_from_home": row["dist_from_home"],
+            "is_fraud": row["is_fraud"],
+            "risk_score": score,
+            "date": row["date"],
+            "flagged": score > FLAG_THRESHOLD,
+        })
+    return txns
+
+
+def build_store(df, scores) -> TransactionStore:
+    store = TransactionStore.from_frame(df, scores, flag_threshold=FLAG_THRESHOLD)
+    store.index_of("")  # include the id index in build time and memory
+    return store
+
+
+def measure(build, df, scores):
+    """Return (result, seconds, retained bytes) for one build."""
+    start = time.perf_counter()
+    build(df, scores)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(df, scores)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, seconds, retained
+
+
+def time_per_call(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def run(n: int, lookups: int) -> dict:
+    df = generate_transactions(count=n, seed=42)
+    scores = np.round(np.random.default_rng(0).random(n), 3).tolist()
+
+    txns, dict_s, dict_bytes = measure(build_dicts, df, scores)
+    store, store_s, store_bytes = measure(build_store, df, scores)
+
+    probe = [f"TXN-{i + 1:05d}" for i in np.random.default_rng(1).integers(0, n, lookups)]
+    scan_lookups = probe[: max(1, lookups // 100)]
+    dict_lookup = time_per_call(
+        lambda: [next(i for i, t in enumerate(txns) if t["id"] == p) for p in scan_lookups], 1
+    ) / len(scan_lookups)
+    store_lookup = time_per_call(lambda: [store.index_of(p) for p in probe], 1) / len(probe)
+
+    page = np.arange(0, n, max(1, n // 100))[:100]
+    dict_page = time_per_call(lambda: [txns[i] for i in page], 20)
+    store_page = time_per_call(lambda: store.rows(page), 20)
+
+    return {
+        "rows": n,
+        "build_s": {"dicts": round(dict_s, 3), "store": round(store_s, 3)},
+        "memory_mb": {
+            "dicts": round(dict_bytes / 2**20, 1),
+            "store": round(store_bytes / 2**20, 1),
+            "store_report": round(store.memory_usage()["total"] / 2**20, 1),
+        },
+        "id_lookup_us": {"dicts": round(dict_lookup * 1e6, 2), "store": round(store_lookup * 1e6, 3)},
+        "page_100_rows_us": {"dicts": round(dict_page * 1e6, 1), "store": round(store_page * 1e6, 1)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        r = run(n, args.lookups)
+        print(f"\n{n:,} rows")
+        for key in ("build_s", "memory_mb", "id_lookup_us", "page_100_rows_us"):
+            print(f"  {key:<18} " + "  ".join(f"{k}={v}" for k, v in r[key].items()))
+
+
+if __name__ == "__main__":
+    main()
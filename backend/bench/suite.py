@@ -0,0 +1,250 @@
+"""
+Benchmark suite for the scoring, evaluation and explanation paths.
+
+Times feature extraction, ``predict_risk_scores`` per model,
+``evaluate_at_threshold``, ``compute_roc_curve`` and SHAP (``explain_rows``,
+and ``explain_batch``'s native TreeSHAP)
+on generated datasets of each ``--sizes`` entry, plus end-to-end API
+requests through a local test client. Every case reports latency
+percentiles, throughput and the peak traced allocation of one call; the
+results are JSON, and ``--baseline`` compares them with an earlier run.
+
+Run from the project root:
+    python -m backend.bench --sizes 1000 100000 --out bench.json
+    python -m backend.bench --baseline backend/bench/baseline.json   # exit 1 on regressions
+    python -m backend.bench --sizes 10000000 --cases 'extract*' 'predict*'
+"""
+
+import argparse
+import fnmatch
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from backend.bench.timing import peak_rss_mb
+from backend.data.constants import BATCH_MAX_ROWS
+from backend.data.generator import generate_transactions_vectorized
+from backend.ml.model import (
+    FLAG_THRESHOLD, compute_roc_curve, evaluate_at_threshold, extract_features,
+    features_from_columns, predict_risk_scores,
+)
+from backend.ml.shap_explain import explain_batch, explain_rows
+
+# name, rows per call, fn
+Case = tuple[str, int, Callable[[], object]]
+
+MODELS = ("xgboost", "tensorflow")
+# Rows explained per SHAP call; KernelExplainer is orders of magnitude slower per row
+SHAP_ROWS = {"xgboost": 1000, "tensorflow": 10}
+# p50 slower than the baseline by more than this fraction is a regression
+TOLERANCE = 0.25
+
+
+def measure(fn: Callable[[], object], rows: int, min_time: float, min_reps: int, max_reps: int) -> dict:
+    """Latency distribution of ``fn()`` after a warm-up call (which loads
+    models and fills caches), then the peak allocation of one more call."""
+    fn()
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_reps and (len(samples) < min_reps or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ms = np.array(samples) * 1000
+    p50 = float(np.percentile(ms, 50))
+    return {
+        "rows": rows,
+        "reps": len(ms),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(p50, 4),
+        "p90_ms": round(float(np.percentile(ms, 90)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "max_ms": round(float(ms.max()), 4),
+        "rows_per_s": round(rows / (p50 / 1000), 1) if p50 > 0 else None,
+        "peak_alloc_mb": round(peak / 2**20, 2),
+    }
+
+
+def ml_cases(size: int, seed: int) -> Iterator[Case]:
+    """Cases over one generated dataset of ``size`` rows."""
+    df = generate_transactions_vectorized(count=size, seed=seed)
+    X = features_from_columns(df, dtype=np.float64)
+    y = df["is_fraud"].tolist()
+    scores = predict_risk_scores(df, "xgboost")
+
+    yield "extract_features", size, lambda: extract_features(df)
+    for model in MODELS:
+        yield f"predict_risk_scores[{model}]", size, lambda m=model: predict_risk_scores(df, m)
+    yield "evaluate_at_threshold", size, lambda: evaluate_at_threshold(y, scores, FLAG_THRESHOLD)
+    yield "compute_roc_curve", size, lambda: compute_roc_curve(y, scores)
+    for model, cap in SHAP_ROWS.items():
+        n = min(size, cap)
+        yield f"explain_rows[{model}]", n, lambda m=model, n=n: explain_rows(m, X[:n])
+    n = min(size, BATCH_MAX_ROWS)
+    yield "explain_batch[xgboost]", n, lambda: explain_batch("xgboost", X[:n])
+
+
+def api_cases(client) -> Iterator[Case]:
+    """Single requests through the app, on the served dataset."""
+    ids = itertools.cycle(t["id"] for t in client.get("/api/transactions").json()["transactions"])
+    txn = {"amount": 412.5, "merchant": "Amazon", "city": "Chicago", "hour": 3, "velocity": 6, "distFromHome": 820.0}
+
+    def call(method: str, url: str, **kwargs) -> Callable[[], object]:
+        return lambda: client.request(method, url, **kwargs).raise_for_status()
+
+    for model in MODELS:
+        yield f"GET /api/transactions[{model}]", 1, call(
+            "GET", f"/api/transactions?model={model}&limit=50&sort=-risk_score"
+        )
+        yield f"POST /api/score[{model}]", 1, call(
+            "POST", "/api/score", json={"model": model, "transactions": [txn]}
+        )
+        yield f"POST /api/model/evaluate[{model}]", 1, call(
+            "POST", "/api/model/evaluate", json={"model": model, "threshold": 0.5}
+        )
+        yield f"GET /api/model/roc[{model}]", 1, call("GET", f"/api/model/roc?model={model}")
+    # A different transaction per call, so the explanation cache does not answer
+    yield "GET /api/model/shap/{id}[xgboost]", 1, lambda: client.get(
+        f"/api/model/shap/{next(ids)}?model=xgboost"
+    ).raise_for_status()
+    batch = [next(ids) for _ in range(100)]
+    yield "POST /api/model/shap/batch[xgboost]", len(batch), call(
+        "POST", "/api/model/shap/batch", json={"model": "xgboost", "ids": batch}
+    )
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    import xgboost
+
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "xgboost": xgboost.__version__,
+        "cpus": os.cpu_count(),
+        "platform": platform.platform(),
+        "env": {k: v for k, v in sorted(os.environ.items()) if k.startswith("FRAUD_") or k == "WEB_CONCURRENCY"},
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Per-case p50 ratio against the baseline run, for cases in both."""
+    rows = []
+    for key, r in results.items():
+        base = baseline.get("results", {}).get(key)
+        if base is None or not base["p50_ms"]:
+            continue
+        ratio = r["p50_ms"] / base["p50_ms"]
+        status = "regression" if ratio > 1 + tolerance else "improvement" if ratio < 1 / (1 + tolerance) else "ok"
+        rows.append({
+            "case": key, "baseline_p50_ms": base["p50_ms"], "p50_ms": r["p50_ms"],
+            "ratio": round(ratio, 3), "status": status,
+        })
+    return rows
+
+
+def run(args) -> dict:
+    def selected(name: str) -> bool:
+        return not args.cases or any(fnmatch.fnmatch(name, pattern) for pattern in args.cases)
+
+    def record(name: str, rows: int, fn: Callable[[], object]) -> None:
+        key = f"{name}@{rows}"
+        if not selected(name) or key in results:
+            return
+        results[key] = {"case": name, **measure(fn, rows, args.min_time, args.min_reps, args.max_reps)}
+        r = results[key]
+        print(f"{key:<48} p50 {r['p50_ms']:>11.3f} ms  p99 {r['p99_ms']:>11.3f} ms  "
+              f"{r['rows_per_s'] or 0:>14,.0f} rows/s  {r['peak_alloc_mb']:>9.1f} MB", file=sys.stderr)
+
+    results: dict[str, dict] = {}
+    for size in args.sizes:
+        for name, rows, fn in ml_cases(size, args.seed):
+            record(name, rows, fn)
+    if not args.no_api:
+        from fastapi.testclient import TestClient
+
+        from backend.main import app
+
+        with TestClient(app) as client:
+            for name, rows, fn in api_cases(client):
+                record(name, rows, fn)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000],
+                        help="Generated dataset sizes for the ML cases (1k to 10M)")
+    parser.add_argument("--cases", nargs="+", help="Only cases matching these glob patterns")
+    parser.add_argument("--no-api", action="store_true", help="Skip the end-to-end API cases")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to keep repeating each case")
+    parser.add_argument("--min-reps", type=int, default=5)
+    parser.add_argument("--max-reps", type=int, default=1000)
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Allowed p50 slowdown before a case counts as a regression")
+    args = parser.parse_args()
+
+    started = time.time()
+    results = run(args)
+    report = {
+        "environment": environment(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("out", "baseline")},
+        "seconds": round(time.time() - started, 1),
+        "results": results,
+    }
+    peak = peak_rss_mb()
+    if peak is not None:
+        report["peak_rss_mb"] = round(peak)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            report["comparison"] = compare(results, json.load(fh), args.tolerance)
+        regressions = [c for c in report["comparison"] if c["status"] == "regression"]
+        for c in report["comparison"]:
+            print(f"{c['case']:<48} {c['baseline_p50_ms']:>11.3f} -> {c['p50_ms']:>11.3f} ms  "
+                  f"x{c['ratio']:<6} {c['status']}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
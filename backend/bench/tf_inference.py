@@ -0,0 +1,60 @@
+"""
+Per-call latency of the TensorFlow model's inference backends.
+
+Compares keras ``Model.predict``, a direct ``model(x, training=False)``
+call, a ``tf.function`` with a fixed input signature and the NumPy export
+with the scaler folded in (the serving path).
+
+Run from the project root:
+    python -m backend.bench.tf_inference --batch-sizes 1 32 10000
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from backend.bench.timing import latency_us
+from backend.data.generator import generate_transactions_vectorized
+from backend.ml.model import features_from_columns
+from backend.ml.tf_model import load_tf_mlp, load_tf_model, scale_features
+
+
+def backends():
+    import tensorflow as tf
+
+    model = load_tf_model()
+    mlp = load_tf_mlp()
+    compiled = tf.function(
+        lambda x: model(x, training=False),
+        input_signature=[tf.TensorSpec([None, 6], tf.float32)],
+    )
+    return {
+        "keras_predict": lambda X: model.predict(scale_features(X), verbose=0).ravel(),
+        "keras_call": lambda X: np.asarray(model(scale_features(X).astype(np.float32), training=False)).ravel(),
+        "tf_function": lambda X: compiled(scale_features(X).astype(np.float32)).numpy().ravel(),
+        "numpy_folded": mlp,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TF inference backends.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 10_000])
+    args = parser.parse_args()
+
+    X_all = features_from_columns(generate_transactions_vectorized(max(args.batch_sizes), seed=7))
+    fns = backends()
+    reference = fns["keras_predict"](X_all)
+
+    print(f"{'backend':<14}" + "".join(f"{f'batch={n}':>16}" for n in args.batch_sizes) + f"{'max |diff|':>14}")
+    for name, fn in fns.items():
+        row = [latency_us(fn, X_all[:n]) for n in args.batch_sizes]
+        diff = float(np.abs(fn(X_all) - reference).max())
+        print(f"{name:<14}" + "".join(f"{us:>13,.1f} us" for us in row) + f"{diff:>14.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import statistics
+import sys
+import time
+
+
+def latency_us(fn, x, min_time: float = 0.5, max_calls: int = 2000) -> float:
+    """Median per-call latency of ``fn(x)`` in microseconds, after one warm-up call."""
+    fn(x)
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_calls and (len(samples) < 5 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn(x)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MB; ``None`` where unavailable."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KiB elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
@@ -0,0 +1,59 @@
+"""
+Per-call latency of the XGBoost scoring paths.
+
+Compares ``XGBClassifier.predict_proba`` on a DataFrame (the original
+path) and on a NumPy array, ``Booster.inplace_predict`` through
+``XGBoostEngine`` at different ``nthread`` settings, and the flattened
+NumPy tree evaluator (alone and as the small-batch half of ``"auto"``).
+
+Run from the project root:
+    python -m backend.bench.xgb_inference --batch-sizes 1 32 1000 100000
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from backend.bench.timing import latency_us
+from backend.data.generator import generate_transactions_vectorized
+from backend.ml.model import FEATURE_COLUMNS, features_from_columns, load_model
+from backend.ml.xgb_engine import XGBoostEngine
+
+
+def backends(nthreads: list[int]):
+    model = load_model()
+    fns = {
+        "sklearn_frame": lambda X: model.predict_proba(pd.DataFrame(X, columns=FEATURE_COLUMNS))[:, 1],
+        "sklearn_array": lambda X: model.predict_proba(X)[:, 1],
+    }
+    for n in nthreads:
+        fns[f"inplace_nt{n}"] = XGBoostEngine(model.get_booster().copy(), nthread=n).predict
+    fns["numpy_flat"] = XGBoostEngine(model.get_booster().copy(), backend="numpy").predict
+    fns["auto"] = XGBoostEngine(model.get_booster().copy(), backend="auto").predict
+    return fns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark XGBoost scoring paths.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1000, 100_000])
+    parser.add_argument("--nthread", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    X_all = features_from_columns(generate_transactions_vectorized(max(args.batch_sizes), seed=7))
+    fns = backends(sorted(set(args.nthread)))
+    reference = fns["sklearn_frame"](X_all)
+
+    print(f"{'backend':<14}" + "".join(f"{f'batch={n}':>16}" for n in args.batch_sizes) + f"{'max |diff|':>14}")
+    for name, fn in fns.items():
+        row = [latency_us(fn, X_all[:n]) for n in args.batch_sizes]
+        diff = float(np.abs(fn(X_all) - reference).max())
+        print(f"{name:<14}" + "".join(f"{us:>13,.1f} us" for us in row) + f"{diff:>14.2e}")
+
+
+if __name__ == "__main__":
+    main()
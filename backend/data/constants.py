@@ -13,3 +13,10 @@ CITIES = [
 CARD_TYPES = ["Visa", "Mastercard", "Amex"]
 
 FRAUD_RATE = 0.12
+
+# Seeded dataset the API scores and explains
+DATASET_SIZE = 500
+DATASET_SEED = 42
+
+# Transactions explained by one SHAP batch request
+BATCH_MAX_ROWS = 10_000
@@ -1,13 +1,25 @@
 import random
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
 from .constants import MERCHANTS, CITIES, CARD_TYPES, FRAUD_RATE
 
 
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
 def generate_transactions(count: int = 500, seed: int | None = None) -> pd.DataFrame:
-    """Generate synthetic transaction data matching the JS generator's distributions."""
+    """Generate synthetic transaction data matching the JS generator's distributions.
+
+    This row-by-row version defines the seeded datasets the shipped models
+    and the API use; see ``generate_transactions_vectorized`` for large
+    volumes.
+    """
     if seed is not None:
         random.seed(seed)
 
@@ -69,3 +81,116 @@ def generate_transactions(count: int = 500, seed: int | None = None) -> pd.DataF
         )
 
     return pd.DataFrame(rows)
+
+
+def _generate_chunk(seed_seq: np.random.SeedSequence, start: int, count: int) -> pd.DataFrame:
+    """Vectorized equivalent of ``generate_transactions`` for ids start+1..start+count."""
+    rng = np.random.default_rng(seed_seq)
+    is_fraud = rng.random(count) < FRAUD_RATE
+
+    # Hour: fraud skews toward 1am-5am (60% chance)
+    hour = rng.integers(0, 24, count)
+    late_night = is_fraud & (rng.random(count) < 0.6)
+    hour[late_night] = rng.integers(1, 6, int(late_night.sum()))
+
+    # Amount: fraud skews high (50% chance of $2000-$10000)
+    u = rng.random(count)
+    high = rng.random(count) < 0.5
+    amount = np.where(
+        is_fraud,
+        np.where(high, u * 8000 + 2000, u * 500 + 10),
+        u * 400 + 5,
+    )
+
+    velocity = np.where(
+        is_fraud, rng.integers(5, 20, count), rng.integers(1, 5, count)
+    )
+    u = rng.random(count)
+    dist_from_home = np.where(is_fraud, u * 8000 + 500, u * 200)
+
+    # Fraud can use any merchant/city; legitimate skews toward first few
+    merchant = (rng.random(count) * np.where(is_fraud, len(MERCHANTS), 8)).astype(np.intp)
+    city = (rng.random(count) * np.where(is_fraud, len(CITIES), 5)).astype(np.intp)
+
+    day = rng.integers(1, 14, count)
+    minute = rng.integers(0, 60, count)
+    date = (
+        np.datetime64("2026-02-01T00:00", "m")
+        + (day - 1) * np.timedelta64(1, "D")
+        + hour * np.timedelta64(1, "h")
+        + minute * np.timedelta64(1, "m")
+    )
+
+    ids = np.arange(start + 1, start + count + 1).astype(str)
+    return pd.DataFrame(
+        {
+            "id": np.char.add("TXN-", np.char.zfill(ids, 5)),
+            "amount": np.round(amount, 2),
+            "merchant": pd.Categorical.from_codes(merchant, MERCHANTS),
+            "city": pd.Categorical.from_codes(city, CITIES),
+            "card_type": pd.Categorical.from_codes(
+                rng.integers(0, len(CARD_TYPES), count), CARD_TYPES
+            ),
+            "hour": hour,
+            "velocity": velocity,
+            "dist_from_home": np.round(dist_from_home).astype(np.int64),
+            "is_fraud": is_fraud,
+            "date": np.datetime_as_string(date.astype("datetime64[s]"), unit="s"),
+        },
+        index=pd.RangeIndex(start, start + count),
+    )
+
+
+def iter_transaction_chunks(
+    count: int,
+    seed: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """Stream ``count`` synthetic transactions as DataFrames of ``chunk_size`` rows.
+
+    Each chunk draws from its own ``SeedSequence.spawn`` child, so output
+    is reproducible for a given seed and chunk size regardless of
+    ``workers``. With ``workers > 1`` chunks are generated in a process
+    pool, at most two per worker ahead of the consumer, and still yielded
+    in order.
+    """
+    children = np.random.SeedSequence(seed).spawn(-(-count // chunk_size))
+    jobs = [
+        (child, start, min(chunk_size, count - start))
+        for child, start in zip(children, range(0, count, chunk_size))
+    ]
+    if workers <= 1:
+        for job in jobs:
+            yield _generate_chunk(*job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.submit(_generate_chunk, *job))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def generate_transactions_vectorized(
+    count: int = 500,
+    seed: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """NumPy-based ``generate_transactions`` for multi-million-row datasets.
+
+    Same distributions and columns, but a different random stream: rows do
+    not match ``generate_transactions`` for the same seed. Merchant, city
+    and card type come back as pandas Categoricals.
+    """
+    chunks = list(iter_transaction_chunks(count, seed, chunk_size, workers))
+    if not chunks:
+        return pd.DataFrame(columns=[
+            "id", "amount", "merchant", "city", "card_type", "hour",
+            "velocity", "dist_from_home", "is_fraud", "date",
+        ])
+    return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
@@ -0,0 +1,154 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .store import TransactionStore
+
+SORT_KEYS = ("id", "risk_score", "amount", "date", "hour", "velocity", "dist_from_home")
+
+# Rows examined per step while filling a page from a sorted order
+_SCAN_CHUNK = 1024
+
+
+@dataclass(frozen=True)
+class TransactionFilter:
+    """Row predicate for transaction queries; ``None`` fields are ignored.
+
+    Score and date bounds are inclusive; dates are ``datetime64[s]``.
+    """
+    flagged: bool | None = None
+    is_fraud: bool | None = None
+    merchant: str | None = None
+    city: str | None = None
+    min_score: float | None = None
+    max_score: float | None = None
+    date_from: np.datetime64 | None = None
+    date_to: np.datetime64 | None = None
+
+    def is_empty(self) -> bool:
+        return all(v is None for v in vars(self).values())
+
+
+class TransactionIndex:
+    """Sort orders built once over a ``TransactionStore``.
+
+    A page is filled by walking the precomputed order for the sort key and
+    testing filters chunk by chunk, so it costs O(page size) for
+    unselective filters instead of filtering and sorting the whole dataset.
+    """
+
+    def __init__(self, store: TransactionStore):
+        self.columns = store.columns
+        self.n = len(store)
+        self._orders: dict[tuple[str, bool], np.ndarray] = {}
+        self._sort_keys: dict[tuple[str, bool], np.ndarray] = {}
+        self._counts: dict[TransactionFilter, int] = {}
+        self._category_ids = {
+            name: {v: i for i, v in enumerate(store.categories[name])}
+            for name in ("merchant", "city")
+        }
+
+    def _numeric(self, key: str) -> np.ndarray:
+        values = self.columns[key]
+        return values.view(np.int64) if values.dtype.kind == "M" else values
+
+    def order(self, key: str, descending: bool = False) -> np.ndarray:
+        """Row ids sorted by ``key``; ties keep dataset order."""
+        cached = self._orders.get((key, descending))
+        if cached is None:
+            if key == "id":
+                asc = np.argsort(self.columns[key], kind="stable")
+                cached = asc[::-1].copy() if descending else asc
+            else:
+                values = self._numeric(key).astype(np.float64)
+                cached = np.argsort(-values if descending else values, kind="stable")
+            self._orders[(key, descending)] = cached
+        return cached
+
+    def _narrow(self, order: np.ndarray, key: str, descending: bool, lo, hi) -> np.ndarray:
+        """Slice ``order`` to rows with ``lo <= key <= hi`` by binary search."""
+        cached = self._sort_keys.get((key, descending))
+        if cached is None:
+            # Keys rise along ``order`` in both directions (negated if descending)
+            values = self._numeric(key).astype(np.float64)[order]
+            cached = -values if descending else values
+            self._sort_keys[(key, descending)] = cached
+        if descending:
+            lo, hi = (None if hi is None else -hi), (None if lo is None else -lo)
+        start = 0 if lo is None else int(np.searchsorted(cached, lo, side="left"))
+        end = len(order) if hi is None else int(np.searchsorted(cached, hi, side="right"))
+        return order[start:end]
+
+    def _mask(self, rows: np.ndarray, f: TransactionFilter) -> np.ndarray | None:
+        """Boolean mask over ``rows``; ``None`` if a category can never match."""
+        c = self.columns
+        mask = np.ones(len(rows), dtype=bool)
+        if f.flagged is not None:
+            mask &= c["flagged"][rows] == f.flagged
+        if f.is_fraud is not None:
+            mask &= c["is_fraud"][rows] == f.is_fraud
+        for name in ("merchant", "city"):
+            value = getattr(f, name)
+            if value is not None:
+                code = self._category_ids[name].get(value)
+                if code is None:
+                    return None
+                mask &= c[name][rows] == code
+        if f.min_score is not None:
+            mask &= c["risk_score"][rows] >= f.min_score
+        if f.max_score is not None:
+            mask &= c["risk_score"][rows] <= f.max_score
+        if f.date_from is not None:
+            mask &= c["date"][rows] >= f.date_from
+        if f.date_to is not None:
+            mask &= c["date"][rows] <= f.date_to
+        return mask
+
+    def count(self, f: TransactionFilter) -> int:
+        """Number of rows matching ``f`` (cached per filter)."""
+        if f.is_empty():
+            return self.n
+        cached = self._counts.get(f)
+        if cached is None:
+            mask = self._mask(np.arange(self.n), f)
+            cached = 0 if mask is None else int(mask.sum())
+            self._counts[f] = cached
+        return cached
+
+    def query(
+        self,
+        f: TransactionFilter,
+        sort: str | None = None,
+        descending: bool = False,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> np.ndarray:
+        """Row ids for one page of rows matching ``f`` in ``sort`` order."""
+        order = self.order(sort, descending) if sort else np.arange(self.n)
+        stop = self.n if limit is None else offset + limit
+        if f.is_empty():
+            return order[offset:stop]
+        if sort == "risk_score" and (f.min_score is not None or f.max_score is not None):
+            order = self._narrow(order, sort, descending, f.min_score, f.max_score)
+        elif sort == "date" and (f.date_from is not None or f.date_to is not None):
+            lo, hi = (
+                None if d is None else d.astype("datetime64[s]").astype(np.int64)
+                for d in (f.date_from, f.date_to)
+            )
+            order = self._narrow(order, sort, descending, lo, hi)
+
+        found: list[np.ndarray] = []
+        need = stop
+        step = max(_SCAN_CHUNK, 2 * need) if limit is not None else max(len(order), 1)
+        for start in range(0, len(order), step):
+            rows = order[start:start + step]
+            mask = self._mask(rows, f)
+            if mask is None:
+                break
+            hits = rows[mask]
+            found.append(hits[:need])
+            need -= len(found[-1])
+            if need <= 0:
+                break
+        matched = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        return matched[offset:stop]
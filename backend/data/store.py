@@ -0,0 +1,141 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Field order of the Transaction schema, which row dicts follow
+FIELDS = (
+    "id", "amount", "merchant", "city", "card_type", "hour", "velocity",
+    "dist_from_home", "is_fraud", "risk_score", "date", "flagged",
+)
+CATEGORICAL = ("merchant", "city", "card_type")
+
+_DTYPES = {
+    "amount": np.float64,
+    "hour": np.int8,
+    "velocity": np.int16,
+    "dist_from_home": np.int32,
+    "is_fraud": np.bool_,
+    "risk_score": np.float64,
+    "flagged": np.bool_,
+}
+
+
+class TransactionStore:
+    """Scored transactions held as one NumPy array per column.
+
+    Merchant, city and card type are dictionary-encoded (``columns`` holds
+    int16 codes, ``categories`` the values), dates are ``datetime64[s]`` and
+    ids a fixed-width string array, so every column is a flat buffer. An
+    id -> row hash index replaces linear scans; given ``id_order`` (the
+    argsort of the ids) lookups binary-search it instead, which needs no
+    per-process index over shared columns.
+    """
+
+    def __init__(
+        self,
+        columns: dict[str, np.ndarray],
+        categories: dict[str, list[str]],
+        id_order: np.ndarray | None = None,
+    ):
+        self.columns = columns
+        self.categories = categories
+        self._category_values = {
+            name: np.array(values, dtype=object) for name, values in categories.items()
+        }
+        self._id_order = id_order
+        self._id_index: dict[str, int] | None = None
+
+    @staticmethod
+    def base_arrays(df: pd.DataFrame, id_order: bool = True) -> dict[str, np.ndarray]:
+        """Every column except the scores as flat arrays, for ``from_arrays``.
+
+        Categories are stored as ``categories.<name>`` string arrays and the
+        id sort order as ``id_order``, so the dict can be saved as ``.npy``
+        files and memory-mapped back.
+        """
+        arrays: dict[str, np.ndarray] = {"id": df["id"].to_numpy(dtype=str)}
+        for name in CATEGORICAL:
+            values, codes = np.unique(df[name].to_numpy(dtype=str), return_inverse=True)
+            arrays[name] = codes.astype(np.int16)
+            arrays[f"categories.{name}"] = values
+        for name in ("amount", "hour", "velocity", "dist_from_home", "is_fraud"):
+            arrays[name] = df[name].to_numpy(dtype=_DTYPES[name])
+        arrays["date"] = df["date"].to_numpy(dtype="datetime64[s]")
+        if id_order:
+            arrays["id_order"] = np.argsort(arrays["id"], kind="stable")
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray], scores, flag_threshold: float) -> "TransactionStore":
+        """Store over ``base_arrays`` output plus one risk score per row.
+
+        The base columns are used as given, without copying, so stores of
+        several models (or processes mapping the same files) share them.
+        """
+        columns = {name: arrays[name] for name in FIELDS if name not in ("risk_score", "flagged")}
+        columns["risk_score"] = np.asarray(scores, dtype=np.float64)
+        columns["flagged"] = columns["risk_score"] > flag_threshold
+        categories = {name: arrays[f"categories.{name}"].tolist() for name in CATEGORICAL}
+        return cls(columns, categories, id_order=arrays.get("id_order"))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, scores, flag_threshold: float) -> "TransactionStore":
+        """Build from a generator DataFrame plus one risk score per row."""
+        return cls.from_arrays(cls.base_arrays(df, id_order=False), scores, flag_threshold)
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def column(self, name: str) -> np.ndarray:
+        """Column values, with categoricals decoded to strings."""
+        values = self.columns[name]
+        if name in self.categories:
+            return self._category_values[name][values]
+        return values
+
+    def index_of(self, txn_id: str) -> int | None:
+        """Row number for ``txn_id`` via the hash index (built on first use)."""
+        if self._id_order is not None:
+            ids = self.columns["id"]
+            i = int(np.searchsorted(ids, txn_id, sorter=self._id_order))
+            if i < len(ids) and ids[self._id_order[i]] == txn_id:
+                return int(self._id_order[i])
+            return None
+        if self._id_index is None:
+            self._id_index = {t: i for i, t in enumerate(self.columns["id"].tolist())}
+        return self._id_index.get(txn_id)
+
+    def rows(
+        self, index: np.ndarray | slice | None = None, keys: tuple[str, ...] = FIELDS
+    ) -> list[dict]:
+        """Materialize rows as dicts in Transaction field order.
+
+        ``keys`` renames the fields positionally, e.g. to their camelCase
+        aliases for direct JSON serialization.
+        """
+        sel = slice(None) if index is None else index
+        values = []
+        for name in FIELDS:
+            col = self.columns[name][sel]
+            if name in self.categories:
+                col = self._category_values[name][col]
+            elif name == "date":
+                col = np.datetime_as_string(col, unit="s")
+            values.append(col.tolist())
+        return [dict(zip(keys, row)) for row in zip(*values)]
+
+    def row(self, i: int) -> dict:
+        return self.rows(np.array([i]))[0]
+
+    def memory_usage(self) -> dict[str, int]:
+        """Bytes held per column plus the id index, with a ``total``."""
+        usage = {name: col.nbytes for name, col in self.columns.items()}
+        for name, values in self.categories.items():
+            usage[name] += sum(sys.getsizeof(v) for v in values)
+        if self._id_index is not None:
+            usage["id_index"] = sys.getsizeof(self._id_index) + sum(
+                sys.getsizeof(k) + sys.getsizeof(v) for k, v in self._id_index.items()
+            )
+        usage["total"] = sum(usage.values())
+        return usage
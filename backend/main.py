@@ -1,9 +1,38 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+
+from .ml.feature_store import save_feature_store
+from .ml.jobs import scheduler
+from .ml.reload import WATCH_INTERVAL, ArtifactWatcher, startup_models, warm_model
+from .routers import transactions, model_eval, scoring, admin, jobs, telemetry
+from .telemetry import TelemetryMiddleware
+
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Opt-in warm-up (FRAUD_WARM_MODELS); otherwise models load on first use
+    for model_id in startup_models():
+        seconds = await run_in_threadpool(warm_model, model_id)
+        logger.info("Warmed %s in %.2fs", model_id, seconds)
+    watcher = ArtifactWatcher(WATCH_INTERVAL) if WATCH_INTERVAL > 0 else None
+    if watcher:
+        watcher.start()
+    yield
+    if watcher:
+        watcher.stop()
+    await scoring.shutdown_batchers()
+    scheduler.shutdown()
+    save_feature_store()
 
-from .routers import transactions, model_eval
 
-app = FastAPI(title="Fraud Detection API")
+app = FastAPI(title="Fraud Detection API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,6 +40,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so latencies include the other middleware
+app.add_middleware(TelemetryMiddleware)
 
 app.include_router(transactions.router)
 app.include_router(model_eval.router)
+app.include_router(scoring.router)
+app.include_router(admin.router)
+app.include_router(jobs.router)
+app.include_router(telemetry.router)
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from collections import Counter, deque
+from collections.abc import Callable, Sequence
+
+_LATENCY_WINDOW = 2048
+
+
+class MicroBatcher:
+    """Coalesce concurrent scoring requests into batched model calls.
+
+    Requests queue up while the previous batch is being scored; the worker
+    then takes the first waiting request and keeps collecting for up to
+    ``max_wait_ms`` or until ``max_batch_size`` rows are gathered, scores
+    them with one ``score_fn`` call in the default executor and fans the
+    results back out to each caller.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[list[dict]], Sequence[float]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+    ):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+        self._started = time.perf_counter()
+        self._requests = 0
+        self._batches = 0
+        self._rows = 0
+        self._max_seen = 0
+        self._batch_sizes: Counter[int] = Counter()
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # Bind to the current loop (a test client may run one per request)
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def submit(self, records: list[dict]) -> list[float]:
+        """Queue ``records`` for scoring and wait for their scores."""
+        queue = self._ensure_worker()
+        future = self._loop.create_future()
+        start = time.perf_counter()
+        await queue.put((records, future))
+        scores = await future
+        self._latencies.append((time.perf_counter() - start) * 1000)
+        return scores
+
+    async def _collect(self, queue: asyncio.Queue) -> list[tuple[list[dict], asyncio.Future]]:
+        batch = [await queue.get()]
+        size = len(batch[0][0])
+        deadline = self._loop.time() + self.max_wait
+        while size < self.max_batch_size:
+            if queue.empty():
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = queue.get_nowait()
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = await self._collect(queue)
+            records = [r for rs, _ in batch for r in rs]
+            try:
+                scores = await self._loop.run_in_executor(None, self.score_fn, records)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            offset = 0
+            for rs, future in batch:
+                if not future.done():
+                    future.set_result(list(scores[offset:offset + len(rs)]))
+                offset += len(rs)
+
+            self._requests += len(batch)
+            self._batches += 1
+            self._rows += len(records)
+            self._max_seen = max(self._max_seen, len(records))
+            # Power-of-two buckets keep the histogram small
+            self._batch_sizes[1 << (len(records) - 1).bit_length()] += 1
+
+    async def close(self) -> None:
+        """Stop the worker task; queued requests are abandoned."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+            self._worker = None
+
+    def stats(self) -> dict:
+        """Queue depth, batch-size distribution, latency and throughput."""
+        latencies = sorted(self._latencies)
+
+        def pct(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+        elapsed = time.perf_counter() - self._started
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "requests": self._requests,
+            "batches": self._batches,
+            "rows": self._rows,
+            "mean_batch_size": round(self._rows / self._batches, 2) if self._batches else 0.0,
+            "max_batch_size": self._max_seen,
+            "batch_size_histogram": {
+                f"<={size}": count for size, count in sorted(self._batch_sizes.items())
+            },
+            "latency_p50_ms": pct(0.50),
+            "latency_p99_ms": pct(0.99),
+            "throughput_rows_per_sec": round(self._rows / elapsed, 1) if elapsed else 0.0,
+        }
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Callable
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+
+from .registry import current_revision, get_spec, model_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent builders may duplicate work
+    fcntl = None
+
+_ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), "artifacts")
+
+CACHE_DIR = os.environ.get("FRAUD_CACHE_DIR", os.path.join(_ARTIFACTS_DIR, "cache"))
+CACHE_ENABLED = os.environ.get("FRAUD_DISK_CACHE", "1") != "0"
+
+# Bump when a cached computation changes meaning without an artifact change
+CACHE_FORMAT = 1
+
+# Lookups of on-disk and shared-memory entries since startup
+stats = {"hits": 0, "misses": 0}
+
+
+@lru_cache(maxsize=16)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """SHA-256 of a file; the stat fields key the cache so edits rehash."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def artifact_hash(model_name: str) -> str:
+    """Combined hash of the artifact files a registered model loads."""
+    h = hashlib.sha256()
+    spec = get_spec(model_name)
+    for name, path in zip(spec.artifacts, spec.paths()):
+        st = os.stat(path)
+        h.update(name.encode())
+        h.update(_file_digest(path, st.st_mtime_ns, st.st_size).encode())
+    return h.hexdigest()[:16]
+
+
+@model_cache
+def loaded_artifact_hash(model_name: str) -> str:
+    """Artifact hash of the current revision of ``model_name``.
+
+    Taken once per revision, before its loaders first read the files, so
+    results of that revision are cached under the artifacts it actually
+    loaded even after a retrain replaces them on disk (until a reload
+    starts the next revision).
+    """
+    return artifact_hash(model_name)
+
+
+@contextmanager
+def pinned_artifacts(model_name: str):
+    """Wrap a loader's reads of ``model_name``'s artifact files.
+
+    Pins the revision's hash first, then checks the files still match it
+    once they are read; a retrain between the two would otherwise load new
+    weights under the old hash.
+    """
+    pinned = loaded_artifact_hash(model_name)
+    yield
+    if artifact_hash(model_name) != pinned:
+        raise RuntimeError(
+            f"Artifacts of {model_name!r} changed since revision "
+            f"{current_revision(model_name)} was loaded; reload the model"
+        )
+
+
+def cache_key(model_name: str, **params) -> str:
+    """Key for a cached computation over the current revision of ``model_name``."""
+    payload = json.dumps(
+        {"format": CACHE_FORMAT, "model": model_name,
+         "artifacts": loaded_artifact_hash(model_name), "params": params},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+@contextmanager
+def _build_lock(entry: str):
+    """Exclusive lock on ``entry`` across processes, so one of them builds it."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{entry}.lock", "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _load(entry: str) -> dict[str, np.ndarray]:
+    return {
+        f[:-4]: np.load(os.path.join(entry, f), mmap_mode="r")
+        for f in os.listdir(entry) if f.endswith(".npy")
+    }
+
+
+def _publish(directory: str, name: str, entry: str, arrays: dict[str, np.ndarray]) -> None:
+    tmp = tempfile.mkdtemp(prefix=f".{name}-", dir=directory)
+    try:
+        for k, v in arrays.items():
+            np.save(os.path.join(tmp, f"{k}.npy"), v, allow_pickle=False)
+        os.replace(tmp, entry)
+    except OSError:
+        # Another process published the same entry first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load_or_publish(
+    directory: str, name: str, key: str, compute: Callable[[], dict[str, np.ndarray]],
+    attach: bool = False,
+) -> dict[str, np.ndarray]:
+    """Load ``directory/name-key``, or compute and publish it.
+
+    Entries are directories of ``.npy`` files loaded memory-mapped and
+    read-only. A new entry is written to a temporary directory and renamed
+    into place, so concurrent processes never see a partial entry, and a
+    lock file makes the others wait for the first builder instead of
+    computing it too. With ``attach`` the builder also returns the
+    published (memory-mapped) arrays rather than its own copies.
+    """
+    entry = os.path.join(directory, f"{name}-{key}")
+    if os.path.isdir(entry):
+        stats["hits"] += 1
+        return _load(entry)
+
+    os.makedirs(directory, exist_ok=True)
+    with _build_lock(entry):
+        if os.path.isdir(entry):
+            stats["hits"] += 1
+            return _load(entry)
+        stats["misses"] += 1
+        arrays = {k: np.asarray(v) for k, v in compute().items()}
+        _publish(directory, name, entry, arrays)
+    return _load(entry) if attach else arrays
+
+
+def cached_arrays(
+    name: str, key: str, compute: Callable[[], dict[str, np.ndarray]]
+) -> dict[str, np.ndarray]:
+    """Load ``name``/``key`` from the disk cache, or compute and persist it."""
+    if not CACHE_ENABLED:
+        return compute()
+    return load_or_publish(CACHE_DIR, name, key, compute)
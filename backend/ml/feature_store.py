@@ -0,0 +1,321 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Rolling window for velocity (transactions per hour) and its resolution
+VELOCITY_WINDOW_SECONDS = 3600
+VELOCITY_BUCKETS = 12
+
+# Cards idle for longer than this are evicted
+CARD_TTL_SECONDS = float(os.environ.get("FRAUD_CARD_TTL_SECONDS", str(30 * 86400)))
+MAX_CARDS = int(os.environ.get("FRAUD_MAX_CARDS", "10000000"))
+
+# Where the process-wide store is restored from and snapshotted to
+SNAPSHOT_PATH = os.environ.get("FRAUD_FEATURE_SNAPSHOT")
+
+# A card's home is the centroid of its first few transactions
+HOME_SAMPLES = 10
+
+_EARTH_RADIUS_MILES = 3958.8
+
+
+def haversine_miles(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in miles between coordinate arrays in degrees."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * _EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class CardFeatureStore:
+    """Per-card rolling aggregates for ``velocity`` and ``dist_from_home``.
+
+    Each card owns one slot in flat NumPy arrays: a ring of
+    ``buckets`` time-bucketed transaction counts covering
+    ``window_seconds``, the last bucket written, a home location and a
+    last-seen time. An update touches one ring slot (after zeroing at most
+    ``buckets`` expired ones) and a read sums one ring, so both are O(1)
+    per event; batches are applied with vectorized array operations.
+
+    Velocity is exact to one bucket (5 minutes by default) at the window's
+    trailing edge. Cards idle for ``ttl_seconds`` are evicted as event time
+    advances, and the least recently seen cards make room once
+    ``max_cards`` is reached, so memory stays bounded.
+    """
+
+    def __init__(
+        self,
+        window_seconds: int = VELOCITY_WINDOW_SECONDS,
+        buckets: int = VELOCITY_BUCKETS,
+        ttl_seconds: float = CARD_TTL_SECONDS,
+        max_cards: int = MAX_CARDS,
+        capacity: int = 1024,
+    ):
+        if window_seconds % buckets:
+            raise ValueError("window_seconds must be a multiple of buckets")
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self.bucket_seconds = window_seconds // buckets
+        self.ttl_seconds = ttl_seconds
+        self.max_cards = max_cards
+
+        self._slots: dict = {}
+        self._card_of: list = []
+        self._free: list[int] = []
+        self._next_sweep = -np.inf
+        self._lock = threading.Lock()
+        self._allocate(min(capacity, max_cards))
+
+    def _allocate(self, capacity: int) -> None:
+        old = getattr(self, "counts", None)
+        n = 0 if old is None else len(old)
+        arrays = {
+            "counts": np.zeros((capacity, self.buckets), dtype=np.uint16),
+            "last_bucket": np.zeros(capacity, dtype=np.int64),
+            "last_seen": np.full(capacity, -np.inf),
+            "home_lat": np.zeros(capacity, dtype=np.float32),
+            "home_lon": np.zeros(capacity, dtype=np.float32),
+            "home_n": np.zeros(capacity, dtype=np.uint8),
+        }
+        for name, arr in arrays.items():
+            if n:
+                arr[:n] = getattr(self, name)
+            setattr(self, name, arr)
+        self._card_of.extend([None] * (capacity - n))
+        self._free.extend(range(capacity - 1, n - 1, -1))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _reserve(self, n: int, protect: np.ndarray) -> None:
+        """Free ``n`` slots: grow up to ``max_cards``, then evict the least
+        recently seen cards not in ``protect``.
+        """
+        while len(self._free) < n and len(self._card_of) < self.max_cards:
+            self._allocate(min(2 * len(self._card_of), self.max_cards))
+        short = n - len(self._free)
+        if short > 0:
+            seen = self.last_seen.copy()
+            seen[protect] = -np.inf
+            used = np.flatnonzero(seen > -np.inf)
+            k = min(len(used), max(short, self.max_cards // 100))
+            if k < short:
+                raise ValueError(f"Batch needs {n} new cards but max_cards is {self.max_cards}")
+            self._release(used[np.argpartition(seen[used], k - 1)[:k]])
+
+    def _release(self, slots: np.ndarray) -> None:
+        for s in slots.tolist():
+            del self._slots[self._card_of[s]]
+            self._card_of[s] = None
+            self._free.append(s)
+        self.counts[slots] = 0
+        self.last_seen[slots] = -np.inf
+        self.home_n[slots] = 0
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Evict cards not seen for ``ttl_seconds`` before ``now``."""
+        now = time.time() if now is None else now
+        with self._lock:
+            idle = np.flatnonzero(self.last_seen < now - self.ttl_seconds)
+            idle = idle[self.last_seen[idle] > -np.inf]
+            self._release(idle)
+            return len(idle)
+
+    def _window_sum(self, slots: np.ndarray, bucket: np.ndarray) -> np.ndarray:
+        """Transactions per slot in the window ending at ``bucket``."""
+        last = self.last_bucket[slots]
+        # Bucket index held by each ring position of each slot
+        pos = np.arange(self.buckets)
+        held = last[:, None] - (last[:, None] - pos) % self.buckets
+        live = (held > bucket[:, None] - self.buckets) & (held <= bucket[:, None])
+        return (self.counts[slots] * live).sum(axis=1)
+
+    def update_many(self, card_ids, timestamps, lat, lon) -> tuple[np.ndarray, np.ndarray]:
+        """Record transactions and return their ``(velocity, dist_from_home)``.
+
+        Velocity counts the card's transactions in the trailing window
+        including this one; distance is measured from the card's home as
+        it stood before this transaction. Events for the same card apply in
+        input order: the batch is split into rounds with at most one event
+        per card, each applied vectorized.
+        """
+        ts = np.asarray(timestamps, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        n = len(ts)
+        velocity = np.zeros(n, dtype=np.int64)
+        distance = np.zeros(n, dtype=np.float64)
+        if n == 0:
+            return velocity, distance
+
+        with self._lock:
+            # Event time never moves the eviction clock past wall-clock time
+            now = min(float(ts.max()), time.time())
+            if now >= self._next_sweep:
+                self._sweep(now)
+            slots_get = self._slots.get
+            slots = np.fromiter(
+                (slots_get(c, -1) for c in card_ids), dtype=np.int64, count=n
+            )
+            new = np.flatnonzero(slots < 0)
+            if len(new):
+                new_cards = list(dict.fromkeys(card_ids[i] for i in new.tolist()))
+                self._reserve(len(new_cards), protect=slots[slots >= 0])
+                for card in new_cards:
+                    slot = self._free.pop()
+                    self._slots[card] = slot
+                    self._card_of[slot] = card
+                slots[new] = [self._slots[card_ids[i]] for i in new.tolist()]
+
+            # Occurrence rank of each event within its card, in input order
+            order = np.argsort(slots, kind="stable")
+            sorted_slots = slots[order]
+            starts = np.r_[0, np.flatnonzero(np.diff(sorted_slots)) + 1]
+            rank = np.empty(n, dtype=np.int64)
+            rank[order] = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+
+            for r in range(int(rank.max()) + 1):
+                idx = np.flatnonzero(rank == r)
+                velocity[idx], distance[idx] = self._apply(slots[idx], ts[idx], lat[idx], lon[idx])
+        return velocity, distance
+
+    def _apply(self, slots, ts, lat, lon) -> tuple[np.ndarray, np.ndarray]:
+        """One event per slot: roll the ring forward, count, update home."""
+        bucket = (ts // self.bucket_seconds).astype(np.int64)
+        last = self.last_bucket[slots]
+        fresh = self.last_seen[slots] == -np.inf
+        last = np.where(fresh, bucket, last)
+
+        # Zero ring positions the window moved past (at most ``buckets``)
+        gap = np.where(fresh, self.buckets, np.clip(bucket - last, 0, self.buckets))
+        for k in range(1, self.buckets + 1):
+            rolled = np.flatnonzero(gap >= k)
+            if not len(rolled):
+                break
+            self.counts[slots[rolled], (last[rolled] + k) % self.buckets] = 0
+        newest = np.maximum(last, bucket)
+        self.last_bucket[slots] = newest
+        # Out-of-order events older than the window are not counted
+        in_window = bucket > newest - self.buckets
+        counted = slots[in_window]
+        self.counts[counted, bucket[in_window] % self.buckets] += 1
+
+        velocity = self._window_sum(slots, newest)
+
+        home_n = self.home_n[slots].astype(np.float64)
+        home_lat = self.home_lat[slots].astype(np.float64)
+        home_lon = self.home_lon[slots].astype(np.float64)
+        distance = np.where(home_n > 0, haversine_miles(home_lat, home_lon, lat, lon), 0.0)
+        learning = home_n < HOME_SAMPLES
+        weight = 1 / (home_n[learning] + 1)
+        self.home_lat[slots[learning]] = home_lat[learning] + (lat[learning] - home_lat[learning]) * weight
+        self.home_lon[slots[learning]] = home_lon[learning] + (lon[learning] - home_lon[learning]) * weight
+        self.home_n[slots[learning]] += 1
+        self.last_seen[slots] = np.maximum(self.last_seen[slots], ts)
+        return velocity, distance
+
+    def read_many(self, card_ids, timestamps, lat, lon) -> tuple[np.ndarray, np.ndarray]:
+        """What ``update_many`` would return for these transactions, without recording them.
+
+        The cards' state is copied into a scratch store and the events are
+        applied there, so velocity counts the transaction itself and
+        same-card events build on each other exactly as when they are
+        scored; this store is left untouched.
+        """
+        card_ids = list(card_ids)
+        with self._lock:
+            cards = list(dict.fromkeys(card_ids))
+            scratch = CardFeatureStore(
+                self.window_seconds, self.buckets, self.ttl_seconds,
+                max_cards=max(len(cards), 1), capacity=max(len(cards), 1),
+            )
+            slots_get = self._slots.get
+            known = [(c, slots_get(c)) for c in cards if c in self._slots]
+            if known:
+                src = np.array([slot for _, slot in known], dtype=np.int64)
+                dst = np.arange(len(known))
+                for name in ("counts", "last_bucket", "last_seen", "home_lat", "home_lon", "home_n"):
+                    getattr(scratch, name)[dst] = getattr(self, name)[src]
+                for slot, (card, _) in enumerate(known):
+                    scratch._slots[card] = slot
+                    scratch._card_of[slot] = card
+                scratch._free = [s for s in scratch._free if s >= len(known)]
+            scratch._next_sweep = self._next_sweep
+        return scratch.update_many(card_ids, timestamps, lat, lon)
+
+    def update(self, card_id, timestamp: float, lat: float, lon: float) -> tuple[int, float]:
+        velocity, distance = self.update_many([card_id], [timestamp], [lat], [lon])
+        return int(velocity[0]), float(distance[0])
+
+    def _sweep(self, now: float) -> None:
+        # Called under the lock; idle cards are checked every tenth of a TTL
+        idle = np.flatnonzero(
+            (self.last_seen < now - self.ttl_seconds) & (self.last_seen > -np.inf)
+        )
+        self._release(idle)
+        self._next_sweep = now + self.ttl_seconds / 10
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held, including the card -> slot dict."""
+        arrays = sum(
+            getattr(self, name).nbytes
+            for name in ("counts", "last_bucket", "last_seen", "home_lat", "home_lon", "home_n")
+        )
+        return arrays + sys.getsizeof(self._slots) + sys.getsizeof(self._card_of)
+
+    def snapshot(self, path: str) -> None:
+        """Write live cards to an ``.npz`` file, atomically.
+
+        Card ids must all be strings or all integers.
+        """
+        with self._lock:
+            used = np.flatnonzero(self.last_seen > -np.inf)
+            arrays = {
+                name: getattr(self, name)[used]
+                for name in ("counts", "last_bucket", "last_seen", "home_lat", "home_lon", "home_n")
+            }
+            arrays["card_id"] = np.array([self._card_of[s] for s in used.tolist()])
+            arrays["config"] = np.array([self.window_seconds, self.buckets, self.ttl_seconds, self.max_cards])
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def restore(cls, path: str) -> "CardFeatureStore":
+        with np.load(path, allow_pickle=False) as data:
+            window_seconds, buckets, ttl_seconds, max_cards = data["config"].tolist()
+            n = len(data["card_id"])
+            store = cls(int(window_seconds), int(buckets), ttl_seconds, int(max_cards),
+                        capacity=max(n, 1024))
+            for name in ("counts", "last_bucket", "last_seen", "home_lat", "home_lon", "home_n"):
+                getattr(store, name)[:n] = data[name]
+            cards = data["card_id"].tolist()
+        store._slots = dict(zip(cards, range(n)))
+        store._card_of[:n] = cards
+        store._free = list(range(len(store._card_of) - 1, n - 1, -1))
+        return store
+
+
+_store: CardFeatureStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_feature_store() -> CardFeatureStore:
+    """The process-wide store, restored from ``FRAUD_FEATURE_SNAPSHOT`` if present."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if SNAPSHOT_PATH and os.path.exists(SNAPSHOT_PATH):
+                    _store = CardFeatureStore.restore(SNAPSHOT_PATH)
+                else:
+                    _store = CardFeatureStore()
+    return _store
+
+
+def save_feature_store() -> None:
+    """Snapshot the process-wide store to ``FRAUD_FEATURE_SNAPSHOT`` (if in use)."""
+    if SNAPSHOT_PATH and _store is not None:
+        _store.snapshot(SNAPSHOT_PATH)
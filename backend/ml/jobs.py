@@ -0,0 +1,236 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+
+from .cache import loaded_artifact_hash
+from .registry import activate_revision, current_revision, evict_stale
+
+logger = logging.getLogger(__name__)
+
+# Processes for heavy compute (SHAP, permutation importance); each one
+# loads its own copy of the models it runs
+COMPUTE_WORKERS = int(os.environ.get("FRAUD_COMPUTE_WORKERS", "1"))
+
+# Finished jobs kept for status lookups and deduplication
+JOB_HISTORY_SIZE = 256
+
+
+def _timestamp(t: float | None) -> str | None:
+    if t is None:
+        return None
+    return datetime.fromtimestamp(t, timezone.utc).isoformat(timespec="milliseconds")
+
+
+# Pool-side end of the scheduler's start notifications
+_started = None
+
+
+def _init_worker(started) -> None:
+    global _started
+    _started = started
+
+
+def _use_revision(model_name: str, revision: int, artifacts: str) -> None:
+    """Point this pool process at the server's revision of ``model_name``.
+
+    Pool processes have their own registry, so without this they would keep
+    answering with whatever they loaded first: the old revision's cached
+    models are evicted here too. The artifact hash the server pinned for
+    the revision must match what this process loads.
+    """
+    if current_revision(model_name) != revision:
+        activate_revision(model_name, revision)
+        evict_stale(model_name)
+    loaded = loaded_artifact_hash(model_name)
+    if loaded != artifacts:
+        raise RuntimeError(
+            f"Artifacts of {model_name!r} on disk ({loaded}) are not the ones revision "
+            f"{revision} loaded ({artifacts}); reload the model"
+        )
+
+
+def _run(job_id: str, fn: Callable, args: tuple, pinned: tuple | None):
+    """Pool-side wrapper: reports the start, then runs ``fn`` on the server's revision."""
+    started_at = time.time()
+    _started.put((job_id, started_at))
+    if pinned is not None:
+        _use_revision(*pinned)
+    return started_at, fn(*args)
+
+
+class Job:
+    """One unit of work in the compute pool.
+
+    ``future`` resolves in the server process to the job's result (after
+    any ``on_done`` hook has run), so async handlers can await it.
+    """
+
+    def __init__(self, kind: str, key: Hashable, model: str | None, result_url: str | None):
+        self.id = uuid.uuid4().hex[:16]
+        self.kind = kind
+        self.key = key
+        self.model = model
+        self.result_url = result_url
+        self.future: Future = Future()
+        self.submitted_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.error: str | None = None
+        self._pool_future: Future | None = None
+
+    @property
+    def status(self) -> str:
+        if self.future.done():
+            return "failed" if self.error is not None else "done"
+        if self.started_at is not None:
+            return "running"
+        return "queued"
+
+    def info(self) -> dict:
+        seconds = None
+        if self.finished_at is not None:
+            seconds = round(self.finished_at - (self.started_at or self.submitted_at), 3)
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "model": self.model,
+            "status": self.status,
+            "submitted_at": _timestamp(self.submitted_at),
+            "started_at": _timestamp(self.started_at),
+            "finished_at": _timestamp(self.finished_at),
+            "seconds": seconds,
+            "error": self.error,
+            "result_url": self.result_url,
+        }
+
+
+class ComputeScheduler:
+    """Runs heavy functions in a bounded process pool, one job per key.
+
+    Submitting a key that is queued, running or recently finished returns
+    the existing job instead of starting another, so concurrent identical
+    requests share one computation. Failed jobs are retried on the next
+    submit. The pool is spawned on first use; TensorFlow and XGBoost's
+    OpenMP runtime are not fork-safe. Jobs for a model run on the
+    revision that was active when they were submitted.
+    """
+
+    def __init__(self, workers: int = COMPUTE_WORKERS, history: int = JOB_HISTORY_SIZE):
+        self.workers = max(1, workers)
+        self.history = history
+        self._pool: ProcessPoolExecutor | None = None
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._by_key: dict[Hashable, Job] = {}
+        self._lock = threading.Lock()
+        self._started = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            context = multiprocessing.get_context("spawn")
+            if self._started is None:
+                # Workers report (job id, start time) here as they pick jobs up
+                self._started = context.Queue()
+                threading.Thread(
+                    target=self._listen, args=(self._started,), name="compute-started", daemon=True
+                ).start()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context,
+                initializer=_init_worker, initargs=(self._started,),
+            )
+        return self._pool
+
+    def _listen(self, started) -> None:
+        while (item := started.get()) is not None:
+            job_id, started_at = item
+            job = self._jobs.get(job_id)
+            if job is not None and job.started_at is None:
+                job.started_at = started_at
+
+    def submit(
+        self,
+        kind: str,
+        key: Hashable,
+        fn: Callable,
+        *args,
+        model: str | None = None,
+        result_url: str | None = None,
+        on_done: Callable | None = None,
+    ) -> Job:
+        """Run ``fn(*args)`` in the pool unless a job for ``key`` exists.
+
+        ``fn`` must be importable by the pool processes (a module-level
+        function). With ``model``, the pool process first switches to
+        that model's current revision. ``on_done(result)`` runs in this
+        process before the job's future resolves, e.g. to prime an
+        in-memory cache.
+        """
+        with self._lock:
+            job = self._by_key.get(key)
+            if job is not None and job.status != "failed":
+                return job
+            job = Job(kind, key, model, result_url)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self._trim()
+            pinned = None
+            if model is not None:
+                pinned = (model, current_revision(model), loaded_artifact_hash(model))
+            try:
+                pool_future = self._get_pool().submit(_run, job.id, fn, args, pinned)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); start a fresh pool
+                self._pool = None
+                pool_future = self._get_pool().submit(_run, job.id, fn, args, pinned)
+            job._pool_future = pool_future
+        pool_future.add_done_callback(lambda f: self._finish(job, f, on_done))
+        return job
+
+    def _finish(self, job: Job, pool_future: Future, on_done: Callable | None) -> None:
+        job.finished_at = time.time()
+        try:
+            job.started_at, result = pool_future.result()
+            if on_done is not None:
+                on_done(result)
+        except BaseException as exc:
+            job.error = repr(exc)
+            logger.warning("Compute job %s (%s) failed: %r", job.id, job.kind, exc)
+            job.future.set_exception(exc)
+        else:
+            job.future.set_result(result)
+
+    def _trim(self) -> None:
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.history:
+                break
+            job = self._jobs[job_id]
+            if job.future.done():
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        """Known jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._started is not None:
+            self._started.put(None)
+            self._started = None
+
+
+scheduler = ComputeScheduler()
@@ -0,0 +1,86 @@
+import numpy as np
+
+
+def sigmoid(z: np.ndarray) -> np.ndarray:
+    """Logistic function; very negative inputs round to 0 without warnings."""
+    with np.errstate(over="ignore"):
+        return 1 / (1 + np.exp(-z))
+
+
+_ACTIVATIONS = {
+    "linear": lambda z: z,
+    "relu": lambda z: np.maximum(z, 0, out=z),
+    "sigmoid": sigmoid,
+}
+
+
+class NumpyMLP:
+    """Inference-only forward pass of a Dense/ReLU/sigmoid Keras MLP.
+
+    Calling it is a handful of float32 matmuls, with none of the per-call
+    setup of ``keras.Model.predict`` (data adapters, callbacks, tracing),
+    which dominates for small batches and KernelExplainer's many tiny calls.
+    """
+
+    def __init__(self, weights: list[np.ndarray], biases: list[np.ndarray], activations: list[str]):
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        for name in self.activations:
+            if name not in _ACTIVATIONS:
+                raise ValueError(f"Unsupported activation {name!r}")
+
+    @classmethod
+    def from_keras(cls, model) -> "NumpyMLP":
+        """Export the Dense layers of ``model``; Dropout is a no-op at inference."""
+        weights, biases, activations = [], [], []
+        for layer in model.layers:
+            kind = type(layer).__name__
+            if kind == "Dropout":
+                continue
+            if kind != "Dense":
+                raise ValueError(f"Cannot export layer type {kind}")
+            w, b = layer.get_weights()
+            weights.append(w)
+            biases.append(b)
+            activations.append(layer.activation.__name__)
+        return cls(weights, biases, activations)
+
+    def fold_scaler(self, mean: np.ndarray, scale: np.ndarray) -> "NumpyMLP":
+        """Return a copy that takes raw features, with standardization folded in.
+
+        ``((x - mean) / scale) @ W + b == x @ (W / scale[:, None]) + (b - (mean / scale) @ W)``
+        """
+        w = self.weights[0].astype(np.float64)
+        w_folded = w / scale[:, None]
+        b_folded = self.biases[0] - (mean / scale) @ w
+        return NumpyMLP(
+            [w_folded] + self.weights[1:],
+            [b_folded] + self.biases[1:],
+            self.activations,
+        )
+
+    def __call__(self, X: np.ndarray) -> np.ndarray:
+        """Fraud probability per row of ``X``."""
+        h = np.asarray(X, dtype=np.float32)
+        for w, b, act in zip(self.weights, self.biases, self.activations):
+            h = _ACTIVATIONS[act](h @ w + b)
+        return h.ravel()
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Flat arrays suitable for ``np.savez`` or the disk cache."""
+        arrays = {"activations": np.array(self.activations)}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"w{i}"] = w
+            arrays[f"b{i}"] = b
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "NumpyMLP":
+        activations = [str(a) for a in arrays["activations"]]
+        n = len(activations)
+        return cls(
+            [arrays[f"w{i}"] for i in range(n)],
+            [arrays[f"b{i}"] for i in range(n)],
+            activations,
+        )
@@ -1,18 +1,30 @@
-import os
+import threading
+import time
 from functools import lru_cache
+from typing import TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
-import xgboost as xgb
-from sklearn.preprocessing import OrdinalEncoder
 
-from ..data.constants import MERCHANTS, CITIES
+from ..data.constants import CITIES, DATASET_SEED, DATASET_SIZE, MERCHANTS
+from ..data.store import TransactionStore
+from ..telemetry import observe_batch, span
+from .metrics import ScoreIndex
+from .cache import pinned_artifacts
+from .registry import get_spec, model_cache
+from .shared import SHARED_DATASET, dataset_arrays
+
+if TYPE_CHECKING:
+    import xgboost as xgb
 
 FEATURE_COLUMNS = [
     "amount", "hour", "velocity", "dist_from_home",
     "merchant_encoded", "city_encoded",
 ]
 
+# Risk score above which a transaction is flagged for review
+FLAG_THRESHOLD = 0.6
+
 FEATURE_DISPLAY_NAMES = {
     "amount": "Transaction Amount",
     "hour": "Time of Day",
@@ -22,103 +34,247 @@ FEATURE_DISPLAY_NAMES = {
     "city_encoded": "City",
 }
 
-# Deterministic ordinal encoders fitted on the full category lists
-_merchant_encoder = OrdinalEncoder(
-    categories=[MERCHANTS], handle_unknown="use_encoded_value", unknown_value=-1
-)
-_merchant_encoder.fit(np.array(MERCHANTS).reshape(-1, 1))
+_NUMERIC_COLUMNS = ["amount", "hour", "velocity", "dist_from_home"]
+
+# Deterministic ordinal encodings over the full category lists; unknown -> -1
+_MERCHANT_CODES = {name: float(i) for i, name in enumerate(MERCHANTS)}
+_CITY_CODES = {name: float(i) for i, name in enumerate(CITIES)}
+
+_scratch = threading.local()
+
+
+def _scratch_buffer(n: int) -> np.ndarray:
+    """Per-thread reusable float32 buffer with at least ``n`` feature rows."""
+    buf = getattr(_scratch, "buf", None)
+    if buf is None or len(buf) < n:
+        buf = np.empty((max(n, 64), len(FEATURE_COLUMNS)), dtype=np.float32)
+        _scratch.buf = buf
+    return buf[:n]
+
+
+def _output(n: int, out: np.ndarray | None, dtype) -> np.ndarray:
+    if out is None:
+        return np.empty((n, len(FEATURE_COLUMNS)), dtype=dtype)
+    if out.shape[0] < n or out.shape[1] != len(FEATURE_COLUMNS):
+        raise ValueError(f"out buffer {out.shape} too small for {n} rows")
+    return out[:n]
+
+
+def _encode_column(values, codes: dict[str, float], categories: list[str]) -> np.ndarray:
+    """Dictionary-encode a categorical column without sklearn or pandas."""
+    if type(values).__module__.startswith("pyarrow"):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        # Arrow columns are encoded in C against the category list
+        if pa.types.is_dictionary(values.type):
+            values = values.cast(values.type.value_type)
+        index = pc.index_in(values, value_set=pa.array(categories))
+        return pc.fill_null(index, -1).to_numpy(zero_copy_only=False)
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        # Encode the (few) categories once, then gather by category code
+        lookup = np.array([codes.get(c, -1.0) for c in values.cat.categories] + [-1.0])
+        return lookup[values.cat.codes.to_numpy()]
+    get = codes.get
+    return np.fromiter((get(v, -1.0) for v in values), dtype=np.float64, count=len(values))
+
+
+def _to_numpy(values) -> np.ndarray:
+    if type(values).__module__.startswith("pyarrow"):
+        return values.to_numpy(zero_copy_only=False)
+    return np.asarray(values)
+
+
+def features_from_columns(
+    columns, out: np.ndarray | None = None, dtype=np.float32, online=None
+) -> np.ndarray:
+    """Build the feature matrix from columnar input.
+
+    ``columns`` is anything indexable by column name: a DataFrame, a dict of
+    NumPy arrays or a pyarrow Table/RecordBatch. Returns a C-contiguous
+    ``(n, len(FEATURE_COLUMNS))`` array, written into ``out`` when given.
+
+    With an ``online`` ``CardFeatureStore``, velocity and distance from home
+    are derived per card from ``card_id``, ``timestamp``, ``lat`` and
+    ``lon`` (recording each transaction) instead of read from the input.
+    """
+    n = len(columns["amount"])
+    X = _output(n, out, dtype)
+    numeric = _NUMERIC_COLUMNS if online is None else ["amount", "hour"]
+    with span("extract_features"):
+        for j, name in enumerate(numeric):
+            X[:, j] = np.asarray(columns[name])
+        if online is not None:
+            X[:, 2], X[:, 3] = online.update_many(
+                _to_numpy(columns["card_id"]).tolist(), _to_numpy(columns["timestamp"]),
+                _to_numpy(columns["lat"]), _to_numpy(columns["lon"]),
+            )
+        X[:, 4] = _encode_column(columns["merchant"], _MERCHANT_CODES, MERCHANTS)
+        X[:, 5] = _encode_column(columns["city"], _CITY_CODES, CITIES)
+    return X
+
+
+def _fill_from_records(X: np.ndarray, records: list[dict], online, record: bool) -> None:
+    merchant, city = _MERCHANT_CODES.get, _CITY_CODES.get
+    if online is None:
+        X[:] = [
+            (
+                r["amount"], r["hour"], r["velocity"], r["dist_from_home"],
+                merchant(r["merchant"], -1.0), city(r["city"], -1.0),
+            )
+            for r in records
+        ]
+        return
+
+    X[:] = [
+        (
+            r["amount"], r["hour"], r.get("velocity") or 0, r.get("dist_from_home") or 0,
+            merchant(r["merchant"], -1.0), city(r["city"], -1.0),
+        )
+        for r in records
+    ]
+    carded = [i for i, r in enumerate(records) if r.get("card_id") is not None]
+    if carded:
+        rows = [records[i] for i in carded]
+        now = time.time()
+        lookup = online.update_many if record else online.read_many
+        X[carded, 2], X[carded, 3] = lookup(
+            [r["card_id"] for r in rows], [r.get("timestamp") or now for r in rows],
+            [r["lat"] for r in rows], [r["lon"] for r in rows],
+        )
+
+
+def features_from_records(
+    records: list[dict], out: np.ndarray | None = None, dtype=np.float32, online=None,
+    record: bool = True,
+) -> np.ndarray:
+    """Build the feature matrix straight from transaction dicts.
 
-_city_encoder = OrdinalEncoder(
-    categories=[CITIES], handle_unknown="use_encoded_value", unknown_value=-1
-)
-_city_encoder.fit(np.array(CITIES).reshape(-1, 1))
+    With an ``online`` ``CardFeatureStore``, records carrying a ``card_id``
+    get velocity and distance from home from the store, as in
+    ``features_from_columns``; other records use their own values. With
+    ``record=False`` the store is only read, e.g. to explain a transaction
+    without counting it.
+    """
+    X = _output(len(records), out, dtype)
+    if records:
+        with span("extract_features"):
+            _fill_from_records(X, records, online, record)
+    return X
 
 
-def extract_features(df: pd.DataFrame) -> pd.DataFrame:
+def extract_features(df: pd.DataFrame, online=None) -> pd.DataFrame:
     """Extract numeric feature matrix from a transaction DataFrame."""
-    features = df[["amount", "hour", "velocity", "dist_from_home"]].copy()
-    features["merchant_encoded"] = _merchant_encoder.transform(
-        df[["merchant"]].values
-    ).ravel()
-    features["city_encoded"] = _city_encoder.transform(
-        df[["city"]].values
-    ).ravel()
-    return features[FEATURE_COLUMNS]
+    X = features_from_columns(df, dtype=np.float64, online=online)
+    return pd.DataFrame(X, columns=FEATURE_COLUMNS, index=df.index)
+
+
+def reference_dataset() -> tuple[pd.DataFrame, np.ndarray]:
+    """Generate the seeded dashboard dataset and its feature matrix.
 
+    Not cached: ``reference_arrays`` keeps the columns it needs, so the
+    DataFrame is freed once they are extracted.
+    """
+    from ..data.generator import generate_transactions
 
-_MODEL_PATH = os.path.join(os.path.dirname(__file__), "artifacts", "xgb_model.json")
+    with span("reference_dataset"):
+        df = generate_transactions(count=DATASET_SIZE, seed=DATASET_SEED)
+        X = features_from_columns(df, dtype=np.float64)
+    X.flags.writeable = False
+    return df, X
 
 
 @lru_cache(maxsize=1)
-def load_model() -> xgb.XGBClassifier:
-    """Load the trained XGBoost model from disk (cached)."""
+def reference_arrays() -> dict[str, np.ndarray]:
+    """The reference dataset as flat read-only arrays, built once.
+
+    ``TransactionStore.base_arrays`` columns plus ``features``, the feature
+    matrix. Every model scores, explains and serves these same arrays, so
+    adding a model to the registry adds inference only, not another round
+    of generation and feature extraction. With ``FRAUD_SHARED_DATASET=1``
+    they are mapped from a segment published once for all worker
+    processes, and only the publisher ever generates the DataFrame.
+    """
+    def build() -> dict[str, np.ndarray]:
+        df, X = reference_dataset()
+        return {**TransactionStore.base_arrays(df), "features": X}
+
+    if SHARED_DATASET:
+        return dataset_arrays("reference", build, count=DATASET_SIZE, seed=DATASET_SEED)
+    arrays = build()
+    for values in arrays.values():
+        values.flags.writeable = False
+    return arrays
+
+
+@model_cache
+def load_model(model_name: str = "xgboost") -> "xgb.XGBClassifier":
+    """Load a registered XGBoost model from disk (cached)."""
+    # Imported here so processes serving only TF models never load XGBoost
+    import xgboost as xgb
+
+    spec = get_spec(model_name)
+    if spec.family != "xgboost":
+        raise ValueError(f"Model {model_name!r} is not an XGBoost model")
     model = xgb.XGBClassifier()
-    model.load_model(_MODEL_PATH)
+    with pinned_artifacts(model_name):
+        model.load_model(spec.paths()[0])
     return model
 
 
+def predict_proba(X: np.ndarray, model_name: str = "xgboost") -> np.ndarray:
+    """Fraud probability for a feature matrix in ``FEATURE_COLUMNS`` order."""
+    observe_batch(model_name, len(X))
+    with span("inference"):
+        if get_spec(model_name).family == "tensorflow":
+            from .tf_model import predict_tf_proba
+            return predict_tf_proba(X, model_name=model_name)
+        from .xgb_engine import get_engine
+        return get_engine(model_name).predict(X)
+
+
+def round_scores(probs: np.ndarray) -> list[float]:
+    """Probabilities rounded to the 3 decimals the API reports."""
+    return [round(float(p), 3) for p in probs]
+
+
 def predict_risk_scores(
     df: pd.DataFrame, model_name: str = "xgboost"
 ) -> list[float]:
     """Return fraud probability for each transaction using the specified model."""
-    if model_name == "tensorflow":
-        from .tf_model import predict_tf_scores
-        return predict_tf_scores(df)
-    model = load_model()
-    X = extract_features(df)
-    probs = model.predict_proba(X)[:, 1]
-    return [round(float(p), 3) for p in probs]
+    return round_scores(predict_proba(features_from_columns(df), model_name=model_name))
+
+
+def score_records(records: list[dict], model_name: str = "xgboost") -> list[float]:
+    """Score raw transaction dicts, e.g. a micro-batch from the online path.
+
+    Records with a ``card_id`` take velocity and distance from home from
+    the process-wide online feature store.
+    """
+    online = None
+    if any(r.get("card_id") is not None for r in records):
+        from .feature_store import get_feature_store
+        online = get_feature_store()
+    X = features_from_records(records, out=_scratch_buffer(len(records)), online=online)
+    return round_scores(predict_proba(X, model_name=model_name))
 
 
 def evaluate_at_threshold(
     y_true: list[bool], scores: list[float], threshold: float
 ) -> dict:
-    """Compute confusion matrix and metrics at a given threshold."""
-    tp = fp = fn = tn = 0
-    for truth, score in zip(y_true, scores):
-        predicted_fraud = score > threshold
-        if truth and predicted_fraud:
-            tp += 1
-        elif not truth and predicted_fraud:
-            fp += 1
-        elif truth and not predicted_fraud:
-            fn += 1
-        else:
-            tn += 1
-
-    precision = tp / (tp + fp) if (tp + fp) else 0.0
-    recall = tp / (tp + fn) if (tp + fn) else 0.0
-    f1 = (2 * precision * recall) / (precision + recall) if (precision + recall) else 0.0
-    accuracy = (tp + tn) / len(y_true) if y_true else 0.0
-
-    return {
-        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
-        "precision": round(precision, 4),
-        "recall": round(recall, 4),
-        "f1": round(f1, 4),
-        "accuracy": round(accuracy, 4),
-    }
+    """Compute confusion matrix and metrics at a given threshold.
+
+    One-off convenience wrapper; callers that evaluate many thresholds over
+    the same scores should build a ``ScoreIndex`` once and reuse it.
+    """
+    return ScoreIndex(y_true, scores).evaluate(threshold)
 
 
 def compute_roc_curve(
     y_true: list[bool], scores: list[float]
 ) -> list[dict]:
     """Compute ROC + precision-recall data at 0.05 threshold increments."""
-    points = []
-    for i in range(21):
-        t = round(i * 0.05, 2)
-        m = evaluate_at_threshold(y_true, scores, t)
-        fpr = m["fp"] / (m["fp"] + m["tn"]) if (m["fp"] + m["tn"]) else 0.0
-        tpr = m["tp"] / (m["tp"] + m["fn"]) if (m["tp"] + m["fn"]) else 0.0
-        points.append({
-            "fpr": round(fpr, 3),
-            "tpr": round(tpr, 3),
-            "threshold": t,
-            "precision": m["precision"],
-            "recall": m["recall"],
-            "f1": m["f1"],
-        })
-    return points
+    return ScoreIndex(y_true, scores).curve()
 
 
 def get_feature_importance(
@@ -127,12 +283,12 @@ def get_feature_importance(
     y_true: np.ndarray | None = None,
 ) -> list[dict]:
     """Return feature importance using the specified model."""
-    if model_name == "tensorflow":
+    if get_spec(model_name).family == "tensorflow":
         from .tf_model import get_tf_feature_importance
         if df is None or y_true is None:
             raise ValueError("df and y_true are required for TensorFlow feature importance")
-        return get_tf_feature_importance(df, y_true)
-    model = load_model()
+        return get_tf_feature_importance(df, y_true, model_name=model_name)
+    model = load_model(model_name)
     importances = model.feature_importances_
     result = [
         {
@@ -0,0 +1,125 @@
+import numpy as np
+
+from .jobs import Job, scheduler
+from .model import FEATURE_COLUMNS, FEATURE_DISPLAY_NAMES, predict_proba, reference_arrays
+from .registry import current_revision, model_cache
+
+N_REPEATS = 10
+# Rows scored per permuted copy; larger inputs are subsampled
+MAX_ROWS = 20_000
+
+
+def roc_auc_rows(y_true: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """ROC AUC of each row of ``scores`` (shape ``(k, n)``) against one label vector.
+
+    Mann-Whitney U from average ranks, so ties count one half exactly as in
+    ``sklearn.metrics.roc_auc_score``; all rows are ranked in one call.
+    """
+    from scipy.stats import rankdata
+
+    y = np.asarray(y_true, dtype=bool)
+    n_pos = int(y.sum())
+    n_neg = len(y) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        raise ValueError("AUC needs both fraud and legitimate rows")
+    ranks = rankdata(np.atleast_2d(scores), axis=1)
+    return (ranks[:, y].sum(axis=1) - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+
+def subsample(X: np.ndarray, y: np.ndarray, max_rows: int | None, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """At most ``max_rows`` rows, drawn per class so the fraud rate is kept."""
+    if max_rows is None or len(X) <= max_rows:
+        return X, y
+    rng = np.random.default_rng(seed)
+    y = np.asarray(y, dtype=bool)
+    rows = []
+    for label in (True, False):
+        idx = np.flatnonzero(y == label)
+        take = max(1, round(max_rows * len(idx) / len(y)))
+        rows.append(rng.choice(idx, size=min(take, len(idx)), replace=False))
+    rows = np.sort(np.concatenate(rows))
+    return X[rows], y[rows]
+
+
+def permutation_importance(
+    model_name: str,
+    X: np.ndarray,
+    y: np.ndarray,
+    n_repeats: int = N_REPEATS,
+    max_rows: int | None = MAX_ROWS,
+    seed: int = 42,
+) -> dict:
+    """Drop in ROC AUC when each feature is shuffled, for any registered model.
+
+    Every permuted copy (features × repeats) is stacked with the unpermuted
+    rows into one ``(1 + F·R)·n``-row matrix and scored by a single
+    ``predict_proba`` call; the AUCs of all copies then come from one
+    ranking pass. Rows beyond ``max_rows`` are subsampled per class first,
+    which bounds the stacked batch.
+    """
+    X, y = subsample(np.asarray(X), np.asarray(y), max_rows, seed)
+    n, n_features = X.shape
+    rng = np.random.default_rng(seed)
+
+    stack = np.empty((1 + n_features * n_repeats, n, n_features), dtype=np.float32)
+    stack[:] = X
+    copies = stack[1:].reshape(n_features, n_repeats, n, n_features)
+    for f in range(n_features):
+        # Independent shuffles of column f, one per repeat
+        perms = rng.permuted(np.tile(np.arange(n), (n_repeats, 1)), axis=1)
+        copies[f, :, :, f] = X[perms, f]
+
+    scores = predict_proba(stack.reshape(-1, n_features), model_name=model_name).reshape(len(stack), n)
+    auc = roc_auc_rows(y, scores)
+    drops = (auc[0] - auc[1:]).reshape(n_features, n_repeats)
+
+    features = [
+        {
+            "feature": FEATURE_DISPLAY_NAMES.get(name, name),
+            "importance": round(float(d.mean()), 4),
+            "std": round(float(d.std()), 4),
+        }
+        for name, d in zip(FEATURE_COLUMNS, drops)
+    ]
+    features.sort(key=lambda x: x["importance"], reverse=True)
+    return {
+        "baseline_auc": round(float(auc[0]), 4),
+        "rows": n,
+        "repeats": n_repeats,
+        "features": features,
+    }
+
+
+@model_cache
+def dataset_permutation_importance(
+    model_name: str, n_repeats: int = N_REPEATS, max_rows: int | None = MAX_ROWS
+) -> dict:
+    """Permutation importance over the reference dataset, once per model."""
+    arrays = reference_arrays()
+    return permutation_importance(model_name, arrays["features"], arrays["is_fraud"], n_repeats, max_rows)
+
+
+def _importance_job(model_name: str, n_repeats: int, max_rows: int | None) -> dict:
+    # Runs in a compute pool process
+    return dataset_permutation_importance(model_name, n_repeats, max_rows)
+
+
+def submit_permutation_importance(
+    model_name: str, n_repeats: int, max_rows: int | None, result_url: str | None = None
+) -> Job:
+    """Compute ``dataset_permutation_importance`` in the compute pool.
+
+    The result is primed into this process's cache, unless the model was
+    reloaded while the job ran.
+    """
+    revision = current_revision(model_name)
+
+    def on_done(result):
+        if current_revision(model_name) == revision:
+            dataset_permutation_importance.prime(result, model_name, n_repeats, max_rows)
+
+    return scheduler.submit(
+        "permutation_importance", (model_name, revision, "permutation_importance", n_repeats, max_rows),
+        _importance_job, model_name, n_repeats, max_rows,
+        model=model_name, result_url=result_url, on_done=on_done,
+    )
@@ -0,0 +1,62 @@
+"""
+Publish the shared dataset segments before starting API workers.
+
+Builds the reference dataset and each model's scores (and, with --shap,
+global SHAP values) into FRAUD_SHARED_DIR in this short-lived process, so
+`uvicorn --workers N` started with FRAUD_SHARED_DATASET=1 only maps them.
+Without it the first worker to need a segment builds it and keeps the
+memory that building took.
+
+Run from the project root:
+    python -m backend.ml.publish
+    python -m backend.ml.publish --models xgboost --shap
+    python -m backend.ml.publish --list
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Publishing is what shared mode means, whatever the environment says
+os.environ["FRAUD_SHARED_DATASET"] = "1"
+
+# Allow running as `python -m backend.ml.publish` from project root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from backend.ml.model import reference_arrays
+from backend.ml.registry import list_models
+from backend.ml.shared import SHARED_DIR, prune, segments
+from backend.routers.transactions import _get_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--models", nargs="+", default=["all"], help="Model ids, or all")
+    parser.add_argument("--shap", action="store_true",
+                        help="Also publish global SHAP values (minutes for KernelExplainer models)")
+    parser.add_argument("--list", action="store_true", help="List published segments and exit")
+    args = parser.parse_args()
+
+    if not args.list:
+        model_ids = [s.id for s in list_models()] if args.models == ["all"] else args.models
+        start = time.perf_counter()
+        reference_arrays()
+        print(f"reference dataset      {time.perf_counter() - start:6.1f}s")
+        for model_id in model_ids:
+            start = time.perf_counter()
+            _get_dataset(model_id)
+            if args.shap:
+                from backend.ml.shap_explain import _compute_shap_values
+                _compute_shap_values(model_id)
+            removed = prune(model_id)
+            print(f"{model_id:<22} {time.perf_counter() - start:6.1f}s"
+                  + (f"  (pruned {len(removed)} old version(s))" if removed else ""))
+
+    print(f"\nSegments in {SHARED_DIR}:")
+    for s in segments():
+        print(f"  {s['segment']:<70} {s['arrays']:>3} arrays {s['bytes'] / 2**20:>10.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+import functools
+import inspect
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import numpy as np
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), "artifacts")
+
+# Optional manifest of extra model versions, e.g.
+# [{"id": "xgboost-v2", "family": "xgboost", "artifacts": ["xgb_model_v2.json"]}]
+MANIFEST_PATH = os.environ.get("FRAUD_MODEL_MANIFEST", os.path.join(ARTIFACTS_DIR, "models.json"))
+
+FAMILIES = ("xgboost", "tensorflow")
+
+# Threads used to score one batch against several models
+MAX_PARALLEL_MODELS = int(os.environ.get("FRAUD_MAX_PARALLEL_MODELS", "4"))
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """A registered model: its id, model family and artifact files.
+
+    XGBoost models have one artifact (the booster JSON); TensorFlow models
+    have the ``.keras`` file followed by the scaler ``.joblib``. Relative
+    paths resolve against the artifacts directory.
+    """
+
+    id: str
+    family: str
+    artifacts: tuple[str, ...]
+    version: str | None = None
+
+    def paths(self) -> list[str]:
+        return [os.path.join(ARTIFACTS_DIR, a) for a in self.artifacts]
+
+
+_specs: dict[str, ModelSpec] = {}
+_lock = threading.Lock()
+
+# Active revision per model id. A reload warms revision n + 1 while
+# requests keep resolving to n, then flips this entry.
+_revisions: dict[str, int] = {}
+_next_revision: dict[str, int] = {}
+# Revisions being warmed in the current context, overriding _revisions
+_warming: ContextVar[dict[str, int]] = ContextVar("warming", default={})
+_model_caches: list[dict] = []
+# "module.function" -> model_cache wrapper, for hit/miss statistics
+_named_caches: dict[str, object] = {}
+
+
+def register_model(
+    model_id: str, family: str, artifacts: list[str] | tuple[str, ...], version: str | None = None
+) -> ModelSpec:
+    """Add a model to the registry (replacing any spec with the same id)."""
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown model family {family!r}")
+    expected = 1 if family == "xgboost" else 2
+    if len(artifacts) != expected:
+        raise ValueError(f"{family} models take {expected} artifact(s), got {len(artifacts)}")
+    spec = ModelSpec(model_id, family, tuple(artifacts), version)
+    with _lock:
+        _specs[model_id] = spec
+        revision = _new_revision(model_id)
+        _revisions[model_id] = revision
+    evict_stale(model_id)
+    return spec
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> list[ModelSpec]:
+    """Register every entry of a JSON manifest, if the file exists."""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as fh:
+        entries = json.load(fh)
+    return [
+        register_model(e["id"], e["family"], e["artifacts"], e.get("version"))
+        for e in entries
+    ]
+
+
+def get_spec(model_id: str) -> ModelSpec:
+    """Spec for ``model_id``; raises ``KeyError`` if it is not registered."""
+    try:
+        return _specs[model_id]
+    except KeyError:
+        raise KeyError(f"Model {model_id!r} is not registered") from None
+
+
+def is_registered(model_id: str) -> bool:
+    return model_id in _specs
+
+
+def list_models() -> list[ModelSpec]:
+    return list(_specs.values())
+
+
+def _new_revision(model_id: str) -> int:
+    revision = _next_revision.get(model_id, 0) + 1
+    _next_revision[model_id] = revision
+    return revision
+
+
+def current_revision(model_id: str) -> int:
+    """Revision that cached per-model state is read and built for."""
+    return _warming.get().get(model_id) or _revisions.get(model_id, 0)
+
+
+def begin_revision(model_id: str) -> int:
+    """Allocate a new, not yet active, revision of ``model_id``."""
+    get_spec(model_id)
+    with _lock:
+        return _new_revision(model_id)
+
+
+@contextmanager
+def warming(model_id: str, revision: int):
+    """Within the block, per-model caches build and read ``revision``."""
+    token = _warming.set({**_warming.get(), model_id: revision})
+    try:
+        yield
+    finally:
+        _warming.reset(token)
+
+
+def activate_revision(model_id: str, revision: int) -> None:
+    """Atomically point new lookups of ``model_id`` at ``revision``."""
+    with _lock:
+        _revisions[model_id] = revision
+
+
+def evict_stale(model_id: str) -> int:
+    """Drop cached state of every inactive revision of ``model_id``.
+
+    Requests already holding the old objects keep them; they are freed
+    once those requests finish.
+    """
+    keep = _revisions.get(model_id)
+    evicted = 0
+    for cache in _model_caches:
+        for key in [k for k in list(cache) if k[0] == model_id and k[1] != keep]:
+            if cache.pop(key, None) is not None:
+                evicted += 1
+    return evicted
+
+
+def track_cache(cache) -> None:
+    """Have ``evict_stale`` also drop stale revisions from ``cache``.
+
+    ``cache`` is any mapping keyed by ``(model_id, revision, ...)`` that
+    supports iteration and ``pop``.
+    """
+    _model_caches.append(cache)
+
+
+def model_cache(fn):
+    """Memoize ``fn(model_id, ...)`` per model revision.
+
+    Works like ``lru_cache(maxsize=None)`` with the model's current
+    revision added to the key, so a reload can build the next revision's
+    entries alongside the live ones and ``evict_stale`` can drop the old
+    revision's entries without touching other models. Concurrent misses on
+    the same key are single-flight: one caller computes, the rest wait for
+    its result (and count as hits).
+    """
+    param = next(iter(inspect.signature(fn).parameters.values()))
+    default = param.default
+    cache: dict = {}
+    inflight: dict = {}
+    lock = threading.Lock()
+    stats = {"hits": 0, "misses": 0}
+    track_cache(cache)
+
+    def make_key(args, kwargs):
+        model_id = args[0] if args else kwargs.get(param.name, default)
+        return (model_id, current_revision(model_id), args[1:] if args else (), tuple(kwargs.items()))
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = make_key(args, kwargs)
+        try:
+            value = cache[key]
+            stats["hits"] += 1
+            return value
+        except KeyError:
+            pass
+        with lock:
+            if key in cache:
+                stats["hits"] += 1
+                return cache[key]
+            future = inflight.get(key)
+            owner = future is None
+            if owner:
+                future = inflight[key] = Future()
+                stats["misses"] += 1
+            else:
+                stats["hits"] += 1
+        if not owner:
+            return future.result()
+        try:
+            value = cache.setdefault(key, fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with lock:
+                del inflight[key]
+
+    def prime(value, *args, **kwargs):
+        """Store ``value`` as the result for these arguments, e.g. one
+        computed in another process."""
+        cache[make_key(args, kwargs)] = value
+
+    def is_cached(*args, **kwargs) -> bool:
+        return make_key(args, kwargs) in cache
+
+    def cache_info() -> dict:
+        return {**stats, "entries": len(cache)}
+
+    wrapper.cache_clear = cache.clear
+    wrapper.cache_info = cache_info
+    wrapper.prime = prime
+    wrapper.is_cached = is_cached
+    _named_caches[f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"] = wrapper
+    return wrapper
+
+
+def cache_stats() -> dict[str, dict]:
+    """Hits, misses and entries of every ``model_cache`` function, by name."""
+    return {name: wrapper.cache_info() for name, wrapper in sorted(_named_caches.items())}
+
+
+register_model("xgboost", "xgboost", ("xgb_model.json",))
+register_model("tensorflow", "tensorflow", ("tf_model.keras", "scaler.joblib"))
+load_manifest()
+
+
+_pool: ThreadPoolExecutor | None = None
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=MAX_PARALLEL_MODELS, thread_name_prefix="score-models"
+                )
+    return _pool
+
+
+def score_models(X: np.ndarray, model_ids: list[str]) -> dict[str, np.ndarray]:
+    """Score one feature matrix with several models in parallel threads.
+
+    Features are extracted once by the caller; XGBoost inference and the
+    NumPy MLP release the GIL, so the models genuinely overlap.
+    """
+    from .model import predict_proba
+
+    if len(model_ids) == 1:
+        return {model_ids[0]: predict_proba(X, model_name=model_ids[0])}
+    futures = {m: _get_pool().submit(predict_proba, X, model_name=m) for m in model_ids}
+    return {m: f.result() for m, f in futures.items()}
+
+
+def agreement_stats(
+    scores: dict[str, np.ndarray], champion: str, threshold: float
+) -> list[dict]:
+    """How each challenger's scores compare with the champion's."""
+    base = np.asarray(scores[champion], dtype=np.float64)
+    base_flags = base > threshold
+    stats = []
+    for model_id, s in scores.items():
+        if model_id == champion:
+            continue
+        s = np.asarray(s, dtype=np.float64)
+        flags = s > threshold
+        diff = np.abs(s - base)
+        corr = np.corrcoef(base, s)[0, 1] if len(s) > 1 and base.std() and s.std() else None
+        stats.append({
+            "model": model_id,
+            "champion": champion,
+            "flag_agreement": round(float((flags == base_flags).mean()), 4),
+            "flagged_only_by_champion": int((base_flags & ~flags).sum()),
+            "flagged_only_by_challenger": int((flags & ~base_flags).sum()),
+            "mean_abs_diff": round(float(diff.mean()), 4),
+            "max_abs_diff": round(float(diff.max()), 4),
+            "correlation": None if corr is None else round(float(corr), 4),
+        })
+    return stats
@@ -0,0 +1,178 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .cache import loaded_artifact_hash
+from .model import FEATURE_COLUMNS, predict_proba
+from .registry import (
+    activate_revision, begin_revision, current_revision, evict_stale, get_spec,
+    list_models, warming,
+)
+from .shared import SHARED_DATASET, prune
+
+logger = logging.getLogger(__name__)
+
+# Poll interval for artifact changes in seconds; 0 disables the watcher
+WATCH_INTERVAL = float(os.environ.get("FRAUD_MODEL_WATCH_SECONDS", "0"))
+
+# Models loaded and warmed at startup, comma-separated or "all"; the rest
+# (and the frameworks they need) load on their first request
+WARM_MODELS = os.environ.get("FRAUD_WARM_MODELS", "")
+
+RELOAD_HISTORY_SIZE = 20
+
+_warmers: list[Callable[[str], None]] = []
+_history: deque = deque(maxlen=RELOAD_HISTORY_SIZE)
+# One reload at a time; requests are never blocked by it
+_reload_lock = threading.Lock()
+
+
+def add_warmer(fn: Callable[[str], None]) -> Callable[[str], None]:
+    """Register ``fn(model_id)`` to build per-model state before a swap."""
+    _warmers.append(fn)
+    return fn
+
+
+def _warm(model_id: str) -> None:
+    predict_proba(np.zeros((1, len(FEATURE_COLUMNS)), dtype=np.float32), model_id)
+    for warm in _warmers:
+        warm(model_id)
+
+
+def startup_models(spec: str = WARM_MODELS) -> list[str]:
+    """Model ids named by ``FRAUD_WARM_MODELS``."""
+    if spec.strip() == "all":
+        return [s.id for s in list_models()]
+    return [m.strip() for m in spec.split(",") if m.strip()]
+
+
+def warm_model(model_id: str) -> float:
+    """Load ``model_id`` and build its cached state for the active revision.
+
+    Used at startup so the first request does not pay for importing the
+    model's framework, loading it and scoring the dataset. Returns seconds.
+    """
+    get_spec(model_id)
+    start = time.perf_counter()
+    _warm(model_id)
+    return time.perf_counter() - start
+
+
+def reload_model(model_id: str) -> dict:
+    """Load and warm a new revision of ``model_id``, then swap it in.
+
+    The new revision is built while requests keep using the active one:
+    the model is loaded and run once, then every registered warmer
+    (scored dataset, evaluation and transaction indexes) fills its cache
+    for the new revision. The swap itself is a single dict assignment, and
+    afterwards the old revision's cached state is evicted. Requests that
+    already hold old objects finish on them. In shared mode the segments
+    of the model's previous artifact versions are then unlinked; workers
+    that have not reloaded yet keep their mappings.
+    """
+    get_spec(model_id)
+    with _reload_lock:
+        previous = current_revision(model_id)
+        revision = begin_revision(model_id)
+        start = time.perf_counter()
+        try:
+            with warming(model_id, revision):
+                artifacts = loaded_artifact_hash(model_id)
+                _warm(model_id)
+        except Exception:
+            # Drop whatever the failed revision cached; the old one stays live
+            evict_stale(model_id)
+            raise
+        warm_seconds = time.perf_counter() - start
+
+        swap_start = time.perf_counter()
+        activate_revision(model_id, revision)
+        swap_ms = (time.perf_counter() - swap_start) * 1000
+        evicted = evict_stale(model_id)
+        if SHARED_DATASET:
+            prune(model_id)
+
+    report = {
+        "model": model_id,
+        "previous_revision": previous,
+        "revision": revision,
+        "artifact_hash": artifacts,
+        "warm_seconds": round(warm_seconds, 3),
+        "swap_ms": round(swap_ms, 4),
+        "evicted": evicted,
+        "reloaded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    _history.append(report)
+    return report
+
+
+def reload_history() -> list[dict]:
+    """Most recent reloads, newest first."""
+    return list(reversed(_history))
+
+
+def _artifact_signature(model_id: str) -> tuple | None:
+    try:
+        return tuple(
+            (os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in get_spec(model_id).paths()
+        )
+    except OSError:  # mid-write or removed
+        return None
+
+
+class ArtifactWatcher:
+    """Polls registered models' artifact files and hot-reloads on change.
+
+    A change is acted on once the files look the same on two consecutive
+    polls, so a reload never starts while a trainer is still writing.
+    """
+
+    def __init__(self, interval: float = WATCH_INTERVAL):
+        self.interval = interval
+        self._seen: dict[str, tuple | None] = {}
+        self._pending: dict[str, tuple | None] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._seen = {spec.id: _artifact_signature(spec.id) for spec in list_models()}
+        self._thread = threading.Thread(target=self._run, name="artifact-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def poll(self) -> None:
+        for spec in list_models():
+            signature = _artifact_signature(spec.id)
+            if spec.id not in self._seen:
+                self._seen[spec.id] = signature
+            if signature is None or signature == self._seen[spec.id]:
+                self._pending.pop(spec.id, None)
+                continue
+            if self._pending.get(spec.id) != signature:
+                self._pending[spec.id] = signature
+                continue
+            self._pending.pop(spec.id)
+            self._seen[spec.id] = signature
+            try:
+                report = reload_model(spec.id)
+            except Exception:
+                logger.exception("Hot reload of %s failed", spec.id)
+            else:
+                logger.info(
+                    "Reloaded %s as revision %d (warm %.2fs, swap %.3fms)",
+                    spec.id, report["revision"], report["warm_seconds"], report["swap_ms"],
+                )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll()
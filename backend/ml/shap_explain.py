@@ -1,42 +1,135 @@
+import hashlib
 from functools import lru_cache
+from typing import TYPE_CHECKING
 
 import numpy as np
-import shap
 
-from .model import load_model, extract_features, FEATURE_COLUMNS, FEATURE_DISPLAY_NAMES
-from .tf_model import load_tf_model, load_scaler
+from ..data.constants import DATASET_SEED, DATASET_SIZE
+from ..telemetry import span
+from .jobs import Job, scheduler
+from .model import load_model, reference_arrays, FEATURE_COLUMNS, FEATURE_DISPLAY_NAMES
+from .registry import current_revision, get_spec, model_cache
+from .shared import model_arrays
+from .tf_model import load_tf_mlp, scale_features
 
+if TYPE_CHECKING:
+    import shap
 
-@lru_cache(maxsize=2)
+# Rows explained for global importance per model family; None means the
+# whole dataset.
+# KernelExplainer costs ~0.4 s per row, TreeExplainer is effectively free.
+GLOBAL_SAMPLE_SIZES = {"xgboost": None, "tensorflow": 100}
+
+KERNEL_NSAMPLES = 100
+
+# Per-transaction explanations kept in memory
+EXPLANATION_CACHE_SIZE = 4096
+
+
+def _dataset_features() -> np.ndarray:
+    return reference_arrays()["features"]
+
+
+# Explainer and SHAP caches are keyed by model id and revision
+@model_cache
+def _tree_explainer(model_name: str) -> "shap.TreeExplainer":
+    # shap (with numba and sklearn) is imported on the first explanation
+    import shap
+
+    from .xgb_engine import best_booster
+    return shap.TreeExplainer(best_booster(load_model(model_name)))
+
+
+@model_cache
+def _kernel_explainer(model_name: str) -> "shap.KernelExplainer":
+    """KernelExplainer over a k-means background of the scaled dataset, built once."""
+    import shap
+    background = shap.kmeans(scale_features(_dataset_features(), model_name), 50)
+    # Thousands of small forward passes: the NumPy export avoids predict() overhead
+    return shap.KernelExplainer(load_tf_mlp(model_name, fold_scaler=False), background)
+
+
+def explain_rows(model_name: str, X: np.ndarray) -> tuple[np.ndarray, float]:
+    """SHAP values for the feature rows ``X`` plus the explainer's base value."""
+    with span("shap"):
+        if get_spec(model_name).family == "xgboost":
+            explainer = _tree_explainer(model_name)
+            shap_values = explainer.shap_values(X)
+            # Binary classification may return list of two arrays — take class 1
+            if isinstance(shap_values, list):
+                shap_values = shap_values[1]
+            expected_value = explainer.expected_value
+            if isinstance(expected_value, (list, np.ndarray)):
+                expected_value = expected_value[1]
+            return np.array(shap_values), float(expected_value)
+        else:
+            explainer = _kernel_explainer(model_name)
+            shap_values = explainer.shap_values(
+                scale_features(X, model_name), nsamples=KERNEL_NSAMPLES, silent=True
+            )
+            return np.array(shap_values), float(explainer.expected_value)
+
+
+def _global_sample(model_name: str) -> np.ndarray:
+    X = _dataset_features()
+    size = GLOBAL_SAMPLE_SIZES.get(get_spec(model_name).family)
+    if size is None or size >= len(X):
+        return X
+    rows = np.random.default_rng(0).choice(len(X), size=size, replace=False)
+    return X[np.sort(rows)]
+
+
+@model_cache
 def _compute_shap_values(model_name: str) -> tuple[np.ndarray, float]:
-    """Compute SHAP values for all 500 cached transactions (once per model)."""
-    from ..data.generator import generate_transactions
-
-    df = generate_transactions(count=500, seed=42)
-    X = extract_features(df)
-
-    if model_name == "xgboost":
-        model = load_model()
-        explainer = shap.TreeExplainer(model)
-        shap_values = explainer.shap_values(X)
-        # Binary classification may return list of two arrays — take class 1
-        if isinstance(shap_values, list):
-            shap_values = shap_values[1]
-        expected_value = explainer.expected_value
-        if isinstance(expected_value, (list, np.ndarray)):
-            expected_value = expected_value[1]
-        return np.array(shap_values), float(expected_value)
-    else:
-        tf_model = load_tf_model()
-        scaler = load_scaler()
-        X_scaled = scaler.transform(X)
-        background = shap.kmeans(X_scaled, 50)
-        explainer = shap.KernelExplainer(
-            lambda x: tf_model.predict(x, verbose=0).ravel(),
-            background,
-        )
-        shap_values = explainer.shap_values(X_scaled, nsamples=100)
-        return np.array(shap_values), float(explainer.expected_value)
+    """SHAP values over the global-importance sample, once per model.
+
+    Results are persisted on disk keyed by the model artifacts, so a
+    restart with unchanged artifacts skips the explainer entirely.
+    """
+    cached = model_arrays(
+        "shap", model_name,
+        lambda: dict(zip(("values", "expected"), explain_rows(model_name, _global_sample(model_name)))),
+        count=DATASET_SIZE, seed=DATASET_SEED,
+        sample=GLOBAL_SAMPLE_SIZES.get(get_spec(model_name).family),
+    )
+    return cached["values"], float(cached["expected"])
+
+
+def offloads_shap(model_name: str) -> bool:
+    """Whether SHAP for this model is slow enough to run in the compute pool.
+
+    TreeExplainer answers in milliseconds; KernelExplainer takes seconds
+    per row and minutes for the global sample.
+    """
+    return get_spec(model_name).family != "xgboost"
+
+
+def global_shap_ready(model_name: str) -> bool:
+    return _compute_shap_values.is_cached(model_name)
+
+
+def _global_shap_job(model_name: str) -> tuple[np.ndarray, float]:
+    # Runs in a pool process; also fills the disk cache there
+    values, expected = _compute_shap_values(model_name)
+    return np.array(values), expected
+
+
+def submit_global_shap(model_name: str, result_url: str | None = None) -> Job:
+    """Compute global SHAP values in the compute pool, once per revision.
+
+    The result is primed into this process's cache, unless the model was
+    reloaded while the job ran.
+    """
+    revision = current_revision(model_name)
+
+    def on_done(result):
+        if current_revision(model_name) == revision:
+            _compute_shap_values.prime(result, model_name)
+
+    return scheduler.submit(
+        "global_shap", (model_name, revision, "global_shap"), _global_shap_job, model_name,
+        model=model_name, result_url=result_url, on_done=on_done,
+    )
 
 
 def get_shap_global_importance(model_name: str) -> list[dict]:
@@ -57,28 +150,91 @@ def get_shap_global_importance(model_name: str) -> list[dict]:
     return result
 
 
-def get_transaction_shap(model_name: str, txn_index: int) -> dict:
-    """Return per-feature SHAP breakdown for a single transaction."""
-    from ..data.generator import generate_transactions
+@lru_cache(maxsize=EXPLANATION_CACHE_SIZE)
+def _explain_transaction(
+    model_name: str, revision: int, txn_id: str, features: tuple[float, ...]
+) -> tuple[np.ndarray, float]:
+    # The model revision and feature values are part of the key so a
+    # reloaded model or changed row is never served stale
+    sv, expected_value = explain_rows(model_name, np.array([features]))
+    return sv[0], expected_value
+
 
-    df = generate_transactions(count=500, seed=42)
-    X = extract_features(df)
+def get_transaction_shap(model_name: str, txn_id: str, features: np.ndarray) -> dict:
+    """Return per-feature SHAP breakdown for a single transaction.
 
-    shap_values, expected_value = _compute_shap_values(model_name)
-    sv = shap_values[txn_index]
+    Only this row is explained, and the result is kept in a bounded LRU
+    keyed by (model, transaction), so latency does not grow with the
+    dataset.
+    """
+    values = tuple(float(v) for v in features)
+    sv, expected_value = _explain_transaction(
+        model_name, current_revision(model_name), txn_id, values
+    )
 
-    features = [
+    result = [
         {
             "feature": FEATURE_DISPLAY_NAMES.get(name, name),
-            "raw_value": round(float(X.iloc[txn_index][name]), 4),
+            "raw_value": round(values[i], 4),
             "shap_value": round(float(sv[i]), 6),
         }
         for i, name in enumerate(FEATURE_COLUMNS)
     ]
-    features.sort(key=lambda x: abs(x["shap_value"]), reverse=True)
+    result.sort(key=lambda x: abs(x["shap_value"]), reverse=True)
 
     return {
         "base_value": round(expected_value, 6),
         "output_value": round(expected_value + float(sv.sum()), 6),
-        "features": features,
+        "features": result,
     }
+
+
+def submit_transaction_shap(
+    model_name: str, txn_id: str, features: np.ndarray, result_url: str | None = None
+) -> Job:
+    """``get_transaction_shap`` as a compute-pool job, deduplicated per row."""
+    revision = current_revision(model_name)
+    return scheduler.submit(
+        "transaction_shap", (model_name, revision, "transaction_shap", txn_id),
+        get_transaction_shap, model_name, txn_id, np.asarray(features),
+        model=model_name, result_url=result_url,
+    )
+
+
+def explain_batch(model_name: str, X: np.ndarray) -> tuple[np.ndarray, float]:
+    """SHAP values for many feature rows plus the base value, in one call.
+
+    XGBoost models use the booster's native ``pred_contribs`` (TreeSHAP in
+    C++, no Python-side shap), giving the values ``TreeExplainer`` would;
+    other models go through ``explain_rows``' batched KernelExplainer.
+    """
+    if get_spec(model_name).family != "xgboost":
+        return explain_rows(model_name, X)
+    from .xgb_engine import get_engine
+
+    with span("shap"):
+        values, bias = get_engine(model_name).contributions(X)
+    return values.astype(np.float64), float(bias[0])
+
+
+def batch_explanation(X: np.ndarray, values: np.ndarray, base_value: float) -> dict:
+    """Columnar breakdown: one array per feature for raw and SHAP values."""
+    return {
+        "base_value": round(base_value, 6),
+        "features": [FEATURE_DISPLAY_NAMES.get(name, name) for name in FEATURE_COLUMNS],
+        "output_values": np.round(base_value + values.sum(axis=1), 6),
+        "raw_values": np.ascontiguousarray(np.round(np.asarray(X, dtype=np.float64).T, 4)),
+        "shap_values": np.ascontiguousarray(np.round(values.T, 6)),
+    }
+
+
+def submit_batch_shap(model_name: str, X: np.ndarray, result_url: str | None = None) -> Job:
+    """``explain_batch`` as a compute-pool job, deduplicated per model revision and rows."""
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    revision = current_revision(model_name)
+    digest = hashlib.sha1(X.tobytes()).hexdigest()
+    return scheduler.submit(
+        "batch_shap", (model_name, revision, "batch_shap", digest),
+        explain_batch, model_name, X,
+        model=model_name, result_url=result_url,
+    )
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Callable
+
+import numpy as np
+
+from .cache import CACHE_DIR, cache_key, cached_arrays, load_or_publish, loaded_artifact_hash
+
+# Opt-in: the reference dataset, per-model scores and global SHAP values are
+# published once as read-only .npy segments that every worker process maps,
+# instead of each worker building its own copy
+SHARED_DATASET = os.environ.get("FRAUD_SHARED_DATASET", "0") == "1"
+
+# tmpfs under /dev/shm keeps the segments in shared memory
+SHARED_DIR = os.environ.get("FRAUD_SHARED_DIR") or (
+    "/dev/shm/fraud-detection" if os.path.isdir("/dev/shm") else os.path.join(CACHE_DIR, "shared")
+)
+
+# Bump when the layout of a segment changes
+SEGMENT_FORMAT = 1
+
+
+def _params_key(**params) -> str:
+    payload = json.dumps({"format": SEGMENT_FORMAT, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+def _model_dir(model_name: str, version: str) -> str:
+    return os.path.join(SHARED_DIR, "models", model_name, version)
+
+
+def dataset_arrays(
+    name: str, compute: Callable[[], dict[str, np.ndarray]], **params
+) -> dict[str, np.ndarray]:
+    """Model-independent arrays (the reference dataset), published once per ``params``.
+
+    The first process to ask builds and publishes the segment while the
+    others wait; all of them, the builder included, get read-only views of
+    the same mapped pages.
+    """
+    return load_or_publish(
+        os.path.join(SHARED_DIR, "datasets"), name, _params_key(**params), compute, attach=True
+    )
+
+
+def model_arrays(
+    name: str, model_name: str, compute: Callable[[], dict[str, np.ndarray]], **params
+) -> dict[str, np.ndarray]:
+    """Arrays computed from a model's artifacts, such as its dataset scores.
+
+    In shared mode the segment is published under the model's current
+    artifact hash, so a reload of new artifacts publishes a new version
+    next to the old one and processes still mapping the old version are
+    undisturbed. Otherwise this is the per-process disk cache.
+    """
+    key = cache_key(model_name, **params)
+    if not SHARED_DATASET:
+        return cached_arrays(name, key, compute)
+    return load_or_publish(
+        _model_dir(model_name, loaded_artifact_hash(model_name)), name, key, compute, attach=True
+    )
+
+
+def prune(model_name: str) -> list[str]:
+    """Remove ``model_name``'s segments for artifact versions other than the active revision's.
+
+    Processes that still map a removed segment keep reading it; the
+    memory is freed when the last of them drops its arrays.
+    """
+    root = os.path.join(SHARED_DIR, "models", model_name)
+    if not os.path.isdir(root):
+        return []
+    current = loaded_artifact_hash(model_name)
+    removed = []
+    for version in os.listdir(root):
+        if version != current:
+            shutil.rmtree(os.path.join(root, version), ignore_errors=True)
+            removed.append(version)
+    return removed
+
+
+def segments() -> list[dict]:
+    """Published segments under ``SHARED_DIR`` and their sizes."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(SHARED_DIR):
+        # Skip segments still being written
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        files = [f for f in filenames if f.endswith(".npy")]
+        if files:
+            found.append({
+                "segment": os.path.relpath(dirpath, SHARED_DIR),
+                "arrays": len(files),
+                "bytes": sum(os.path.getsize(os.path.join(dirpath, f)) for f in files),
+            })
+    return found
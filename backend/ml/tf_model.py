@@ -1,81 +1,131 @@
 import os
-from functools import lru_cache
+from typing import TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
 import joblib
-from sklearn.inspection import permutation_importance
 
-from .model import extract_features, FEATURE_COLUMNS, FEATURE_DISPLAY_NAMES
+from .cache import cache_key, cached_arrays, pinned_artifacts
+from .mlp import NumpyMLP
+from .permutation import permutation_importance
+from .registry import get_spec, model_cache
+from .model import extract_features, features_from_columns
 
-os.environ["KERAS_BACKEND"] = "tensorflow"
-import keras
+if TYPE_CHECKING:
+    import keras
 
-_ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), "artifacts")
-_MODEL_PATH = os.path.join(_ARTIFACTS_DIR, "tf_model.keras")
-_SCALER_PATH = os.path.join(_ARTIFACTS_DIR, "scaler.joblib")
 
+def _keras():
+    """Import Keras (and TensorFlow) on first use.
 
-def build_model(input_dim: int = 6) -> keras.Model:
+    Serving only needs it to export a model's weights, which the disk
+    cache skips on restarts, so most API processes never load TensorFlow.
+    """
+    os.environ.setdefault("KERAS_BACKEND", "tensorflow")
+    import keras
+    return keras
+
+
+def build_model(
+    input_dim: int = 6,
+    hidden: tuple[int, ...] = (64, 32),
+    dropout: tuple[float, ...] = (0.3, 0.2),
+    learning_rate: float = 0.001,
+) -> "keras.Model":
     """Build a Keras Sequential model for binary fraud classification."""
-    model = keras.Sequential([
-        keras.layers.Input(shape=(input_dim,)),
-        keras.layers.Dense(64, activation="relu"),
-        keras.layers.Dropout(0.3),
-        keras.layers.Dense(32, activation="relu"),
-        keras.layers.Dropout(0.2),
-        keras.layers.Dense(1, activation="sigmoid"),
-    ])
+    keras = _keras()
+    layers = [keras.layers.Input(shape=(input_dim,))]
+    for units, rate in zip(hidden, dropout):
+        layers.append(keras.layers.Dense(units, activation="relu"))
+        layers.append(keras.layers.Dropout(rate))
+    layers.append(keras.layers.Dense(1, activation="sigmoid"))
+    model = keras.Sequential(layers)
     model.compile(
-        optimizer="adam",
+        optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
         loss="binary_crossentropy",
         metrics=["accuracy"],
     )
     return model
 
 
-@lru_cache(maxsize=1)
-def load_tf_model() -> keras.Model:
-    """Load the trained Keras model from disk (cached)."""
-    return keras.models.load_model(_MODEL_PATH)
+def _artifact_paths(model_name: str) -> list[str]:
+    spec = get_spec(model_name)
+    if spec.family != "tensorflow":
+        raise ValueError(f"Model {model_name!r} is not a TensorFlow model")
+    return spec.paths()
+
+
+# The caches below are keyed by model id and revision
+@model_cache
+def load_tf_model(model_name: str = "tensorflow") -> "keras.Model":
+    """Load a registered Keras model from disk (cached)."""
+    keras = _keras()
+    with pinned_artifacts(model_name):
+        return keras.models.load_model(_artifact_paths(model_name)[0])
+
+
+@model_cache
+def load_scaler(model_name: str = "tensorflow"):
+    """Load the fitted StandardScaler of a registered model (cached)."""
+    with pinned_artifacts(model_name):
+        return joblib.load(_artifact_paths(model_name)[1])
+
+
+@model_cache
+def _exported_arrays(model_name: str = "tensorflow") -> dict[str, np.ndarray]:
+    """Dense weights and scaler statistics of the Keras artifacts.
+
+    Persisted in the disk cache keyed by the revision's artifact hash, so a restart
+    with unchanged artifacts does not need to deserialize the Keras model.
+    """
+    def export() -> dict[str, np.ndarray]:
+        scaler = load_scaler(model_name)
+        arrays = NumpyMLP.from_keras(load_tf_model(model_name)).to_arrays()
+        arrays["scaler_mean"] = scaler.mean_
+        arrays["scaler_scale"] = scaler.scale_
+        return arrays
 
+    return cached_arrays("tf_mlp", cache_key(model_name), export)
 
-@lru_cache(maxsize=1)
-def load_scaler():
-    """Load the fitted StandardScaler from disk (cached)."""
-    return joblib.load(_SCALER_PATH)
 
+@model_cache
+def load_tf_mlp(model_name: str = "tensorflow", fold_scaler: bool = True) -> NumpyMLP:
+    """NumPy forward pass of the TF model (cached).
 
-def predict_tf_scores(df: pd.DataFrame) -> list[float]:
-    """Return fraud probability for each transaction using the TF model."""
-    model = load_tf_model()
-    scaler = load_scaler()
-    X = extract_features(df)
-    X_scaled = scaler.transform(X)
-    probs = model.predict(X_scaled, verbose=0).ravel()
+    With ``fold_scaler`` it takes raw features, the StandardScaler folded
+    into the first layer; otherwise it expects ``scale_features`` output.
+    """
+    arrays = _exported_arrays(model_name)
+    mlp = NumpyMLP.from_arrays(arrays)
+    if fold_scaler:
+        mlp = mlp.fold_scaler(arrays["scaler_mean"], arrays["scaler_scale"])
+    return mlp
+
+
+def scale_features(X: np.ndarray, model_name: str = "tensorflow") -> np.ndarray:
+    """Apply the fitted scaler to a raw feature matrix."""
+    arrays = _exported_arrays(model_name)
+    # Same arithmetic as StandardScaler.transform, minus its input validation
+    return (X - arrays["scaler_mean"]) / arrays["scaler_scale"]
+
+
+def predict_tf_proba(X: np.ndarray, model_name: str = "tensorflow") -> np.ndarray:
+    """Fraud probability for a raw feature matrix using a TF model."""
+    return load_tf_mlp(model_name)(X)
+
+
+def predict_tf_scores(df: pd.DataFrame, model_name: str = "tensorflow") -> list[float]:
+    """Return fraud probability for each transaction using a TF model."""
+    probs = predict_tf_proba(features_from_columns(df), model_name=model_name)
     return [round(float(p), 3) for p in probs]
 
 
 def get_tf_feature_importance(
-    df: pd.DataFrame, y_true: np.ndarray
+    df: pd.DataFrame, y_true: np.ndarray, model_name: str = "tensorflow"
 ) -> list[dict]:
-    """Compute permutation importance for the TF model."""
-    model = load_tf_model()
-    scaler = load_scaler()
-    X = extract_features(df)
-    X_scaled = scaler.transform(X)
-
-    result = permutation_importance(
-        model, X_scaled, y_true,
-        n_repeats=10, random_state=42, scoring="roc_auc",
-    )
-
-    items = [
-        {
-            "feature": FEATURE_DISPLAY_NAMES.get(name, name),
-            "importance": round(float(imp), 4),
-        }
-        for name, imp in zip(FEATURE_COLUMNS, result.importances_mean)
+    """Compute permutation importance (drop in ROC AUC) for a TF model."""
+    result = permutation_importance(model_name, extract_features(df).to_numpy(), y_true)
+    return [
+        {"feature": item["feature"], "importance": item["importance"]}
+        for item in result["features"]
     ]
-    items.sort(key=lambda x: x["importance"], reverse=True)
-    return items
@@ -64,7 +64,11 @@ def main():
 
     # Save model
     os.makedirs(ARTIFACTS_DIR, exist_ok=True)
-    model.save_model(MODEL_PATH)
+    # Write then rename, so a running server's artifact watcher never
+    # sees a half-written file
+    tmp_path = os.path.join(ARTIFACTS_DIR, ".xgb_model.tmp.json")
+    model.save_model(tmp_path)
+    os.replace(tmp_path, MODEL_PATH)
     print(f"Model saved to {MODEL_PATH}")
 
 
@@ -0,0 +1,398 @@
+"""
+Hyperparameter search over both model families on streamed training data.
+
+Run from the project root:
+    python -m backend.ml.train_search --rows 10000000 --max-cpus 8 --save
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import average_precision_score, log_loss, roc_auc_score
+
+# Allow running as `python -m backend.ml.train_search` from project root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from backend.bench.timing import peak_rss_mb
+from backend.data.generator import iter_transaction_chunks
+from backend.ml.model import FEATURE_COLUMNS, features_from_columns
+from backend.ml.registry import get_spec
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), "artifacts")
+REPORT_PATH = os.path.join(ARTIFACTS_DIR, "search_report.json")
+
+# Grids sampled by the search; every combination is a candidate trial
+XGB_SEARCH_SPACE = {
+    "max_depth": [4, 6, 8],
+    "learning_rate": [0.05, 0.1, 0.3],
+    "min_child_weight": [1, 5],
+    "subsample": [0.8, 1.0],
+    "colsample_bytree": [0.8, 1.0],
+}
+TF_SEARCH_SPACE = {
+    "hidden": [(64, 32), (128, 64), (32,)],
+    "dropout": [0.1, 0.3],
+    "learning_rate": [0.001, 0.003],
+    "batch_size": [256, 1024],
+}
+
+
+class TransactionIter(xgb.DataIter):
+    """Feeds generated transaction chunks to XGBoost one at a time.
+
+    XGBoost sketches quantiles and bins each chunk as it arrives, so the
+    float feature matrix for the full training set never exists in memory.
+    With ``cache_prefix`` the binned pages go to disk as well (external
+    memory).
+    """
+
+    def __init__(self, rows: int, seed: int, chunk_size: int, cache_prefix: str | None = None):
+        self.rows = rows
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self._chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._chunks is None:
+            self._chunks = iter_transaction_chunks(self.rows, self.seed, self.chunk_size)
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        input_data(
+            data=features_from_columns(chunk),
+            label=chunk["is_fraud"].to_numpy(dtype=np.float32),
+        )
+        return True
+
+    def reset(self) -> None:
+        self._chunks = None
+
+
+def load_arrays(rows: int, seed: int, chunk_size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Features and labels for ``rows`` generated transactions, chunk by chunk."""
+    X = np.empty((rows, len(FEATURE_COLUMNS)), dtype=np.float32)
+    y = np.empty(rows, dtype=np.float32)
+    start = 0
+    for chunk in iter_transaction_chunks(rows, seed, chunk_size):
+        end = start + len(chunk)
+        features_from_columns(chunk, out=X[start:end])
+        y[start:end] = chunk["is_fraud"].to_numpy()
+        start = end
+    return X, y
+
+
+# Per-process data, built on a worker's first trial and reused by the rest
+_datasets: dict = {}
+
+
+def _validation(data: dict) -> tuple[np.ndarray, np.ndarray]:
+    key = ("val", data["val_rows"], data["seed"])
+    if key not in _datasets:
+        # A separate seed, so validation rows never overlap training rows
+        _datasets[key] = load_arrays(data["val_rows"], data["seed"] + 1, data["chunk_size"])
+    return _datasets[key]
+
+
+def _xgb_matrices(data: dict, nthread: int) -> tuple[xgb.DMatrix, xgb.DMatrix]:
+    key = ("xgb", data["rows"], data["seed"], data["max_bin"], data["external_memory"])
+    if key not in _datasets:
+        cache_prefix = None
+        if data["external_memory"]:
+            cache_prefix = os.path.join(tempfile.mkdtemp(prefix="xgb-cache-"), "train")
+        it = TransactionIter(data["rows"], data["seed"], data["chunk_size"], cache_prefix)
+        if cache_prefix is not None:
+            dtrain = xgb.ExtMemQuantileDMatrix(it, max_bin=data["max_bin"], nthread=nthread)
+        else:
+            dtrain = xgb.QuantileDMatrix(it, max_bin=data["max_bin"], nthread=nthread)
+        X_val, y_val = _validation(data)
+        dval = xgb.QuantileDMatrix(X_val, y_val, ref=dtrain, nthread=nthread)
+        _datasets[key] = (dtrain, dval)
+    return _datasets[key]
+
+
+def _scores(y_val: np.ndarray, prob: np.ndarray) -> dict:
+    return {
+        "val_auc": round(float(roc_auc_score(y_val, prob)), 5),
+        "val_average_precision": round(float(average_precision_score(y_val, prob)), 5),
+        "val_logloss": round(float(log_loss(y_val, np.clip(prob, 1e-7, 1 - 1e-7))), 5),
+    }
+
+
+def _run_xgb(params: dict, data: dict, nthread: int, out_dir: str) -> dict:
+    start = time.perf_counter()
+    dtrain, dval = _xgb_matrices(data, nthread)
+    data_seconds = time.perf_counter() - start
+
+    labels = dtrain.get_label()
+    pos = float(labels.sum())
+    booster_params = {
+        "objective": "binary:logistic",
+        "tree_method": "hist",
+        "max_bin": data["max_bin"],
+        "eval_metric": "logloss",
+        "scale_pos_weight": (len(labels) - pos) / pos if pos else 1.0,
+        "nthread": nthread,
+        "seed": data["seed"],
+        **params,
+    }
+    start = time.perf_counter()
+    booster = xgb.train(
+        booster_params, dtrain,
+        num_boost_round=data["rounds"],
+        evals=[(dval, "val")],
+        early_stopping_rounds=data["early_stopping_rounds"],
+        verbose_eval=False,
+    )
+    fit_seconds = time.perf_counter() - start
+
+    # Keep only the rounds up to the best validation loss
+    best = booster[: booster.best_iteration + 1]
+    X_val, y_val = _validation(data)
+    start = time.perf_counter()
+    prob = best.inplace_predict(X_val, validate_features=False)
+    predict_seconds = time.perf_counter() - start
+
+    path = os.path.join(out_dir, "xgb_model.json")
+    best.save_model(path)
+    return {
+        "data_seconds": round(data_seconds, 3),
+        "fit_seconds": round(fit_seconds, 3),
+        "predict_seconds": round(predict_seconds, 3),
+        "rounds": booster.num_boosted_rounds(),
+        "best_iteration": booster.best_iteration,
+        **_scores(y_val, prob),
+        "artifacts": [path],
+    }
+
+
+def _run_tf(params: dict, data: dict, nthread: int, out_dir: str) -> dict:
+    import joblib
+    import keras
+    from sklearn.preprocessing import StandardScaler
+
+    from backend.ml.tf_model import build_model
+
+    start = time.perf_counter()
+    key = ("tf", data["tf_rows"], data["seed"])
+    if key not in _datasets:
+        _datasets[key] = load_arrays(data["tf_rows"], data["seed"], data["chunk_size"])
+    X, y = _datasets[key]
+    X_val, y_val = _validation(data)
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X).astype(np.float32)
+    X_val_scaled = scaler.transform(X_val).astype(np.float32)
+    data_seconds = time.perf_counter() - start
+
+    pos = float(y.sum())
+    class_weight = {0: 1.0, 1: (len(y) - pos) / pos if pos else 1.0}
+    hidden = tuple(params["hidden"])
+    keras.utils.set_random_seed(data["seed"])
+    model = build_model(
+        input_dim=X.shape[1],
+        hidden=hidden,
+        dropout=(params["dropout"],) * len(hidden),
+        learning_rate=params["learning_rate"],
+    )
+    early_stop = keras.callbacks.EarlyStopping(
+        monitor="val_loss", patience=data["patience"], restore_best_weights=True
+    )
+    start = time.perf_counter()
+    history = model.fit(
+        X_scaled, y,
+        validation_data=(X_val_scaled, y_val),
+        epochs=data["epochs"],
+        batch_size=params["batch_size"],
+        class_weight=class_weight,
+        callbacks=[early_stop],
+        verbose=0,
+    )
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    prob = model.predict(X_val_scaled, batch_size=8192, verbose=0).ravel()
+    predict_seconds = time.perf_counter() - start
+
+    model_path = os.path.join(out_dir, "tf_model.keras")
+    scaler_path = os.path.join(out_dir, "scaler.joblib")
+    model.save(model_path)
+    joblib.dump(scaler, scaler_path)
+    val_loss = history.history["val_loss"]
+    return {
+        "data_seconds": round(data_seconds, 3),
+        "fit_seconds": round(fit_seconds, 3),
+        "predict_seconds": round(predict_seconds, 3),
+        "epochs": len(val_loss),
+        "best_epoch": int(np.argmin(val_loss)) + 1,
+        **_scores(y_val, prob),
+        "artifacts": [model_path, scaler_path],
+    }
+
+
+def _init_worker(cpus: list[int] | None, nthread: int) -> None:
+    """Confine a pool process to the allowed cores and thread budget."""
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    # Read by TensorFlow when Keras is first imported in this process
+    os.environ["KERAS_BACKEND"] = "tensorflow"
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(nthread)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+
+
+def run_trial(trial: dict) -> dict:
+    """Train and validate one candidate; runs inside a pool process."""
+    out_dir = os.path.join(trial["out_dir"], trial["id"])
+    os.makedirs(out_dir, exist_ok=True)
+    run = _run_xgb if trial["family"] == "xgboost" else _run_tf
+    start = time.perf_counter()
+    result = run(trial["params"], trial["data"], trial["nthread"], out_dir)
+    peak = peak_rss_mb()
+    return {
+        "id": trial["id"],
+        "family": trial["family"],
+        "params": trial["params"],
+        "status": "ok",
+        **result,
+        "total_seconds": round(time.perf_counter() - start, 3),
+        # The worker's peak across its trials so far
+        "worker_peak_rss_mb": None if peak is None else round(peak, 1),
+    }
+
+
+def sample_trials(space: dict, count: int, seed: int) -> list[dict]:
+    """Up to ``count`` distinct combinations from a search grid."""
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    return random.Random(seed).sample(grid, min(count, len(grid)))
+
+
+def _install(paths: list[str], model_id: str) -> None:
+    # Temp file + rename per artifact, like the training scripts
+    for src, dest in zip(paths, get_spec(model_id).paths()):
+        tmp = os.path.join(os.path.dirname(dest), "." + os.path.basename(dest) + ".tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+        print(f"  {src} -> {dest}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Training rows (streamed)")
+    parser.add_argument("--val-rows", type=int, default=200_000, help="Held-out validation rows")
+    parser.add_argument("--tf-rows", type=int, default=200_000,
+                        help="Training rows for the Keras MLP, which fits from memory")
+    parser.add_argument("--chunk-size", type=int, default=250_000, help="Rows per generated chunk")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--families", nargs="+", default=["xgboost", "tensorflow"],
+                        choices=["xgboost", "tensorflow"])
+    parser.add_argument("--trials", type=int, default=4, help="Trials per model family")
+    parser.add_argument("--rounds", type=int, default=1000, help="Max boosting rounds")
+    parser.add_argument("--early-stopping-rounds", type=int, default=20)
+    parser.add_argument("--max-bin", type=int, default=256)
+    parser.add_argument("--external-memory", action="store_true",
+                        help="Keep XGBoost's binned training pages on disk")
+    parser.add_argument("--epochs", type=int, default=30, help="Max Keras epochs")
+    parser.add_argument("--patience", type=int, default=5, help="Keras early-stopping patience")
+    parser.add_argument("--max-cpus", type=int, default=os.cpu_count() or 1,
+                        help="Cores the whole search may use")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Concurrent trials (default: as many as --max-cpus allows)")
+    parser.add_argument("--out-dir", default=None, help="Where trial models are kept")
+    parser.add_argument("--report", default=REPORT_PATH, help="JSON report path")
+    parser.add_argument("--save", action="store_true",
+                        help="Install each family's best model as its registered artifacts")
+    args = parser.parse_args()
+
+    data = {
+        "rows": args.rows, "val_rows": args.val_rows, "tf_rows": args.tf_rows,
+        "chunk_size": args.chunk_size, "seed": args.seed, "max_bin": args.max_bin,
+        "external_memory": args.external_memory, "rounds": args.rounds,
+        "early_stopping_rounds": args.early_stopping_rounds,
+        "epochs": args.epochs, "patience": args.patience,
+    }
+    spaces = {"xgboost": XGB_SEARCH_SPACE, "tensorflow": TF_SEARCH_SPACE}
+    out_dir = args.out_dir or tempfile.mkdtemp(prefix="fraud-search-")
+    trials = [
+        {"family": family, "params": params}
+        for family in args.families
+        for params in sample_trials(spaces[family], args.trials, args.seed)
+    ]
+
+    # Split the core budget: workers × threads per trial <= max_cpus
+    max_cpus = max(1, args.max_cpus)
+    workers = max(1, min(args.workers or max_cpus, max_cpus, len(trials)))
+    nthread = max(1, max_cpus // workers)
+    cpus = None
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))[:max_cpus]
+    for i, trial in enumerate(trials):
+        trial.update(id=f"{trial['family']}-{i:02d}", data=data, nthread=nthread, out_dir=out_dir)
+
+    print(f"{len(trials)} trials on {workers} worker(s) × {nthread} thread(s); "
+          f"{args.rows:,} training rows, {args.val_rows:,} validation rows")
+    results = []
+    start = time.perf_counter()
+    # Spawned, not forked: XGBoost's OpenMP and TensorFlow state are not fork-safe
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(cpus, nthread),
+    ) as pool:
+        futures = {pool.submit(run_trial, trial): trial for trial in trials}
+        for future in as_completed(futures):
+            trial = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                result = {"id": trial["id"], "family": trial["family"], "params": trial["params"],
+                          "status": "failed", "error": repr(exc)}
+                print(f"  {trial['id']}: failed ({exc!r})")
+            else:
+                print(f"  {result['id']}: AUC {result['val_auc']:.4f}  AP {result['val_average_precision']:.4f}"
+                      f"  fit {result['fit_seconds']:.1f}s  {result['params']}")
+            results.append(result)
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda r: r["id"])
+    best = {}
+    for family in args.families:
+        ok = [r for r in results if r["family"] == family and r["status"] == "ok"]
+        if ok:
+            best[family] = max(ok, key=lambda r: r["val_auc"])["id"]
+
+    report = {
+        "data": data,
+        "max_cpus": max_cpus,
+        "workers": workers,
+        "threads_per_trial": nthread,
+        "wall_seconds": round(elapsed, 3),
+        "trials": results,
+        "best": best,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\nSearch took {elapsed:.1f}s; report saved to {args.report}")
+
+    by_id = {r["id"]: r for r in results}
+    for family, trial_id in best.items():
+        r = by_id[trial_id]
+        print(f"Best {family}: {trial_id} (AUC {r['val_auc']:.4f}) {r['params']}")
+        if args.save:
+            _install(r["artifacts"], family)
+
+
+if __name__ == "__main__":
+    main()
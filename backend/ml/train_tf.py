@@ -85,10 +85,15 @@ def main():
 
     # Save artifacts
     os.makedirs(ARTIFACTS_DIR, exist_ok=True)
-    model.save(MODEL_PATH)
+    # Write then rename, so a running server's artifact watcher never
+    # sees a half-written file
+    tmp_path = os.path.join(ARTIFACTS_DIR, ".tf_model.tmp.keras")
+    model.save(tmp_path)
+    os.replace(tmp_path, MODEL_PATH)
     print(f"Model saved to {MODEL_PATH}")
 
-    joblib.dump(scaler, SCALER_PATH)
+    joblib.dump(scaler, SCALER_PATH + ".tmp")
+    os.replace(SCALER_PATH + ".tmp", SCALER_PATH)
     print(f"Scaler saved to {SCALER_PATH}")
 
 
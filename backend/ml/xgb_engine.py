@@ -0,0 +1,169 @@
+import json
+import os
+
+import numpy as np
+import xgboost as xgb
+
+from .mlp import sigmoid
+from .registry import model_cache
+
+# Uvicorn reads WEB_CONCURRENCY for its worker count; split the cores so
+# workers do not oversubscribe them with OpenMP threads.
+_WORKERS = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+XGB_NTHREAD = int(os.environ.get("FRAUD_XGB_NTHREAD", "0")) or max(1, (os.cpu_count() or 1) // _WORKERS)
+
+# "booster" (inplace_predict), "numpy" (flattened trees) or "auto" (numpy
+# for batches up to FLAT_FOREST_MAX_ROWS, where it avoids the booster's
+# per-call overhead, booster above)
+XGB_BACKEND = os.environ.get("FRAUD_XGB_BACKEND", "booster")
+FLAT_FOREST_MAX_ROWS = 32
+
+
+class FlatForest:
+    """All trees of a binary:logistic booster padded into ``(n_trees, n_nodes)`` arrays.
+
+    Every row walks every tree at once: each step gathers the current
+    node's feature and threshold per (row, tree) and moves to the left or
+    right child (child ids are stored flat, ``tree * n_nodes + node``).
+    Leaves point at themselves, so ``max_depth`` steps land every row on a
+    leaf. Splits and leaves are read from the booster's
+    JSON as float32, the same values XGBoost compares against.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, value, base_margin, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.base_margin = base_margin
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_booster(cls, booster: xgb.Booster) -> "FlatForest":
+        learner = json.loads(booster.save_raw("json"))["learner"]
+        if learner["objective"]["name"] != "binary:logistic":
+            raise ValueError("FlatForest only supports binary:logistic boosters")
+        trees = learner["gradient_booster"]["model"]["trees"]
+        base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+
+        n_trees = len(trees)
+        n_nodes = max(len(t["left_children"]) for t in trees)
+        feature = np.zeros((n_trees, n_nodes), dtype=np.intp)
+        threshold = np.zeros((n_trees, n_nodes), dtype=np.float32)
+        left = np.zeros((n_trees, n_nodes), dtype=np.intp)
+        right = np.zeros((n_trees, n_nodes), dtype=np.intp)
+        default_left = np.zeros((n_trees, n_nodes), dtype=bool)
+        value = np.zeros((n_trees, n_nodes), dtype=np.float32)
+
+        max_depth = 0
+        for t, tree in enumerate(trees):
+            lc = np.array(tree["left_children"])
+            rc = np.array(tree["right_children"])
+            split = np.array(tree["split_conditions"], dtype=np.float32)
+            n = len(lc)
+            is_leaf = lc == -1
+            nodes = np.arange(n)
+            feature[t, :n] = tree["split_indices"]
+            threshold[t, :n] = split
+            left[t, :n] = t * n_nodes + np.where(is_leaf, nodes, lc)
+            right[t, :n] = t * n_nodes + np.where(is_leaf, nodes, rc)
+            default_left[t, :n] = np.array(tree["default_left"], dtype=bool)
+            # A leaf's split condition holds its output value
+            value[t, :n] = np.where(is_leaf, split, 0)
+
+            depth = np.zeros(n, dtype=np.intp)
+            for node in range(n):  # children always follow their parent
+                if not is_leaf[node]:
+                    depth[lc[node]] = depth[rc[node]] = depth[node] + 1
+            max_depth = max(max_depth, int(depth.max()))
+
+        base_margin = float(np.log(base_score / (1 - base_score)))
+        return cls(feature, threshold, left, right, default_left, value, base_margin, max_depth)
+
+    def margin(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        n_trees, n_nodes = self.feature.shape
+        # Flat node ids (tree * n_nodes + node), so every gather is a 1-D take
+        node = np.broadcast_to(np.arange(n_trees) * n_nodes, (len(X), n_trees)).copy()
+        feature, threshold = self.feature.ravel(), self.threshold.ravel()
+        left, right = self.left.ravel(), self.right.ravel()
+        for _ in range(self.max_depth):
+            x = np.take_along_axis(X, feature.take(node), axis=1)
+            go_left = x < threshold.take(node)
+            missing = np.isnan(x)
+            if missing.any():
+                go_left[missing] = self.default_left.ravel().take(node[missing])
+            node = np.where(go_left, left.take(node), right.take(node))
+        return self.value.ravel().take(node).sum(axis=1, dtype=np.float32) + np.float32(self.base_margin)
+
+    def __call__(self, X: np.ndarray) -> np.ndarray:
+        return sigmoid(self.margin(X))
+
+
+def best_booster(model: xgb.XGBClassifier) -> xgb.Booster:
+    """A copy of ``model``'s booster cut to its best iteration.
+
+    An early-stopped classifier keeps the trees trained after its best
+    round, which ``predict_proba`` skips; slicing them off once here makes
+    the engine, its flattened forest and TreeSHAP score the same trees.
+    """
+    booster = model.get_booster()
+    best = booster.attr("best_iteration")
+    return booster[: int(best) + 1] if best is not None else booster.copy()
+
+
+class XGBoostEngine:
+    """Scores float32 feature matrices straight through the Booster.
+
+    ``inplace_predict`` reads the array without building a DMatrix or
+    validating a DataFrame, which is most of ``XGBClassifier.predict_proba``'s
+    cost on small batches. ``backend="numpy"`` evaluates a ``FlatForest``
+    export instead, and ``"auto"`` does so only for small batches.
+    """
+
+    def __init__(self, booster: xgb.Booster, nthread: int = XGB_NTHREAD, backend: str = XGB_BACKEND):
+        if backend not in ("booster", "numpy", "auto"):
+            raise ValueError(f"Unknown XGBoost backend {backend!r}")
+        self.booster = booster
+        self.booster.set_param({"nthread": nthread})
+        self.nthread = nthread
+        self.backend = backend
+        self.forest = FlatForest.from_booster(booster) if backend != "booster" else None
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Fraud probability per row of ``X`` (``FEATURE_COLUMNS`` order)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if self.forest is not None and (self.backend == "numpy" or len(X) <= FLAT_FOREST_MAX_ROWS):
+            return self.forest(X)
+        return self.booster.inplace_predict(X, validate_features=False)
+
+    def contributions(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Exact TreeSHAP values per feature (log-odds) and the bias column.
+
+        One ``pred_contribs`` call evaluates every row in XGBoost's C++
+        TreeSHAP, the same values ``shap.TreeExplainer`` computes per call.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        contribs = self.booster.predict(
+            xgb.DMatrix(X, nthread=self.nthread), pred_contribs=True, validate_features=False
+        )
+        return contribs[:, :-1], contribs[:, -1]
+
+
+@model_cache
+def _engine(model_name: str, pid: int) -> XGBoostEngine:
+    from .model import load_model
+    # A copy, so nthread changes never leak into the sklearn wrapper
+    return XGBoostEngine(best_booster(load_model(model_name)))
+
+
+def get_engine(model_name: str = "xgboost") -> XGBoostEngine:
+    """The scoring engine for ``model_name`` in this worker process.
+
+    Keyed by pid so every Uvicorn worker (or forked pool process) loads
+    its own booster rather than sharing one across a fork, where
+    XGBoost's OpenMP state is not safe to reuse.
+    """
+    return _engine(model_name, os.getpid())
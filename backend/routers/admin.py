@@ -0,0 +1,53 @@
+from fastapi import APIRouter, HTTPException
+
+from ..ml import feature_store
+from ..ml.reload import reload_history, reload_model
+from ..schemas import FeatureStoreStats, ReloadReport
+from .transactions import require_model
+
+router = APIRouter(prefix="/api/admin")
+
+
+@router.post("/models/{model_id}/reload", response_model=ReloadReport)
+def reload(model_id: str):
+    """Load, warm and atomically swap in the model's current artifacts.
+
+    Runs in the threadpool, so other requests keep being served by the
+    previous revision until the swap.
+    """
+    require_model(model_id)
+    try:
+        report = reload_model(model_id)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Reload of {model_id} failed: {exc}")
+    return ReloadReport(**report)
+
+
+@router.get("/reloads", response_model=list[ReloadReport])
+def get_reloads():
+    """Recent reloads with warm-up and swap times, newest first."""
+    return [ReloadReport(**r) for r in reload_history()]
+
+
+@router.get("/feature-store", response_model=FeatureStoreStats)
+def get_feature_store_stats():
+    """Size and configuration of the online per-card feature store."""
+    store = feature_store.get_feature_store()
+    return FeatureStoreStats(
+        cards=len(store),
+        capacity=len(store.counts),
+        memory_bytes=store.memory_usage(),
+        window_seconds=store.window_seconds,
+        buckets=store.buckets,
+        ttl_seconds=store.ttl_seconds,
+        snapshot_path=feature_store.SNAPSHOT_PATH,
+    )
+
+
+@router.post("/feature-store/snapshot", response_model=FeatureStoreStats)
+def snapshot_feature_store():
+    """Write the feature store to ``FRAUD_FEATURE_SNAPSHOT`` now."""
+    if not feature_store.SNAPSHOT_PATH:
+        raise HTTPException(status_code=409, detail="FRAUD_FEATURE_SNAPSHOT is not set")
+    feature_store.get_feature_store().snapshot(feature_store.SNAPSHOT_PATH)
+    return get_feature_store_stats()
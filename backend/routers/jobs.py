@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from ..ml.jobs import Job, scheduler
+from ..schemas import JobInfo
+
+router = APIRouter(prefix="/api/jobs")
+
+
+def accepted(job: Job) -> JSONResponse:
+    """202 response pointing the client at the job's status."""
+    return JSONResponse(
+        JobInfo(**job.info()).model_dump(mode="json", by_alias=True),
+        status_code=202,
+        headers={"Location": f"/api/jobs/{job.id}"},
+    )
+
+
+def result_url(request: Request) -> str:
+    """The request's own URL without ``wait``, to fetch the finished result."""
+    url = request.url.remove_query_params("wait")
+    return f"{url.path}?{url.query}" if url.query else url.path
+
+
+@router.get("", response_model=list[JobInfo])
+def get_jobs():
+    """Compute jobs known to this worker, newest first."""
+    return [JobInfo(**job.info()) for job in scheduler.jobs()]
+
+
+@router.get("/{job_id}", response_model=JobInfo)
+def get_job(job_id: str):
+    """Status of one compute job."""
+    job = scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return JobInfo(**job.info())
@@ -1,52 +1,288 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import time
 
-from ..ml.model import evaluate_at_threshold, compute_roc_curve
-from ..ml.shap_explain import get_shap_global_importance, get_transaction_shap
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from starlette.concurrency import run_in_threadpool
+
+from ..data.constants import DATASET_SIZE
+from ..ml.cache import artifact_hash
+from ..ml.jobs import Job
+from ..ml.metrics import CURVE_MODES, live_metrics
+from ..ml.model import FLAG_THRESHOLD, features_from_records
+from ..ml.permutation import (
+    MAX_ROWS, N_REPEATS, dataset_permutation_importance, submit_permutation_importance,
+)
+from ..ml.registry import agreement_stats, current_revision, list_models
+from ..ml.shap_explain import (
+    batch_explanation, explain_batch, get_shap_global_importance, get_transaction_shap,
+    global_shap_ready, offloads_shap, submit_batch_shap, submit_global_shap,
+    submit_transaction_shap,
+)
 from ..schemas import (
-    EvaluateRequest, EvaluateResponse, ROCPoint,
+    EvaluateRequest, EvaluateResponse, ROCPoint, CurveSummary,
     FeatureImportanceItem, TransactionShapResponse, ShapFeatureItem,
+    ShapBatchRequest, ShapBatchResponse,
+    PermutationImportanceResponse,
+    ModelInfo, AgreementStats, OutcomesRequest, LiveMetricsStats,
 )
-from .transactions import _get_dataset
+from ..serialize import JSONBytesResponse, dump_items, dump_object, response_cache
+from ..telemetry import span
+from .jobs import accepted, result_url
+from .transactions import _get_dataset, _get_score_index, model_param, require_model
 
 router = APIRouter(prefix="/api/model")
 
+SOURCE_PATTERN = "^(dataset|live)$"
+
+
+@router.get("/registry", response_model=list[ModelInfo])
+def get_registry():
+    """Registered models with their family, version and artifact hash."""
+    return [
+        ModelInfo(
+            id=spec.id, family=spec.family, version=spec.version,
+            revision=current_revision(spec.id),
+            artifacts=list(spec.artifacts), artifact_hash=artifact_hash(spec.id),
+        )
+        for spec in list_models()
+    ]
+
+
+@router.get("/agreement", response_model=list[AgreementStats])
+def get_agreement(
+    champion: str = Query("xgboost"),
+    challengers: list[str] | None = Query(None),
+):
+    """Agreement of challengers with the champion over the cached dataset."""
+    model_ids = challengers or [s.id for s in list_models() if s.id != champion]
+    scores = {
+        m: _get_dataset(require_model(m)).columns["risk_score"]
+        for m in [champion, *model_ids]
+    }
+    return [AgreementStats(**a) for a in agreement_stats(scores, champion, FLAG_THRESHOLD)]
+
 
 @router.post("/evaluate", response_model=EvaluateResponse)
 def evaluate_model(req: EvaluateRequest):
-    """Evaluate model metrics at a given threshold."""
-    _, scores, y_true = _get_dataset(req.model)
-    result = evaluate_at_threshold(y_true, scores, req.threshold)
+    """Evaluate model metrics at a given threshold.
+
+    ``source=live`` uses outcomes posted to ``/outcomes``, optionally over
+    the trailing ``windowSeconds``.
+    """
+    model = require_model(req.model)
+    if req.source == "live":
+        result = live_metrics(model).evaluate(req.threshold, req.window_seconds)
+    else:
+        result = _get_score_index(model).evaluate(req.threshold)
     return EvaluateResponse(**result)
 
 
 @router.get("/roc", response_model=list[ROCPoint])
-def get_roc_curve(model: str = Query("xgboost", pattern="^(xgboost|tensorflow)$")):
+def get_roc_curve(
+    model: str = Depends(model_param),
+    points: int = Query(21, ge=2, le=10_000),
+    mode: str = Query("uniform", pattern=f"^({'|'.join(CURVE_MODES)})$"),
+    source: str = Query("dataset", pattern=SOURCE_PATTERN),
+    window: int | None = Query(None, ge=1),
+):
     """Return ROC + precision-recall curve data points."""
-    _, scores, y_true = _get_dataset(model)
-    points = compute_roc_curve(y_true, scores)
-    return [ROCPoint(**p) for p in points]
+    if source == "live":
+        curve = live_metrics(model).curve(points=points, mode=mode, window_seconds=window)
+        return JSONBytesResponse(dump_items(ROCPoint, curve))
+    key = (model, current_revision(model), "roc", points, mode)
+    return JSONBytesResponse(response_cache.get_or_build(
+        key, lambda: dump_items(ROCPoint, _get_score_index(model).curve(points=points, mode=mode))
+    ))
+
+
+@router.get("/auc", response_model=CurveSummary)
+def get_auc(
+    model: str = Depends(model_param),
+    source: str = Query("dataset", pattern=SOURCE_PATTERN),
+    window: int | None = Query(None, ge=1),
+):
+    """Return exact AUC-ROC and AUC-PR over the full score distribution."""
+    if source == "live":
+        return CurveSummary(**live_metrics(model).auc(window))
+    return CurveSummary(**_get_score_index(model).auc())
+
+
+@router.post("/outcomes", response_model=LiveMetricsStats)
+def post_outcomes(req: OutcomesRequest):
+    """Record labeled outcomes (e.g. chargebacks) for live metrics.
+
+    Each outcome carries the risk score that was served and the true
+    label; they feed the model's streaming histograms.
+    """
+    model = require_model(req.model)
+    metrics = live_metrics(model)
+    metrics.add_many(
+        [o.risk_score for o in req.outcomes],
+        [o.is_fraud for o in req.outcomes],
+        None if all(o.timestamp is None for o in req.outcomes)
+        else [o.timestamp if o.timestamp is not None else time.time() for o in req.outcomes],
+    )
+    return LiveMetricsStats(model=model, **metrics.stats())
+
+
+@router.get("/live", response_model=LiveMetricsStats)
+def get_live_stats(
+    model: str = Depends(model_param),
+    window: int | None = Query(None, ge=1),
+):
+    """Outcome counts behind the live metrics, all-time and windowed."""
+    return LiveMetricsStats(model=model, **live_metrics(model).stats(window))
+
+
+async def _job_result(job: Job, wait: bool):
+    """``(202 response, None)`` if the caller won't wait, else ``(None, result)``.
+
+    Awaiting the job's future holds no thread, so cheap requests keep
+    being served while a heavy one runs in the compute pool.
+    """
+    if not job.future.done():
+        if not wait:
+            return accepted(job), None
+        try:
+            with span("job_wait"):
+                await asyncio.wrap_future(job.future)
+        except Exception:
+            pass  # reported below from the job record
+    if job.error is not None:
+        raise HTTPException(status_code=500, detail=f"{job.kind} job {job.id} failed: {job.error}")
+    return None, job.future.result()
 
 
 @router.get("/features", response_model=list[FeatureImportanceItem])
-def get_features(model: str = Query("xgboost", pattern="^(xgboost|tensorflow)$")):
-    """Return SHAP-based global feature importance."""
-    items = get_shap_global_importance(model_name=model)
-    return [FeatureImportanceItem(**item) for item in items]
+async def get_features(
+    request: Request,
+    model: str = Depends(model_param),
+    wait: bool = Query(True),
+):
+    """Return SHAP-based global feature importance.
+
+    KernelExplainer models compute it in the compute pool on first use;
+    with ``wait=false`` that first request returns 202 and the job instead.
+    """
+    if offloads_shap(model) and not global_shap_ready(model):
+        pending, _ = await _job_result(submit_global_shap(model, result_url(request)), wait)
+        if pending is not None:
+            return pending
+    key = (model, current_revision(model), "features")
+    body = await run_in_threadpool(
+        response_cache.get_or_build,
+        key, lambda: dump_items(FeatureImportanceItem, get_shap_global_importance(model_name=model)),
+    )
+    return JSONBytesResponse(body)
+
+
+@router.get("/permutation-importance", response_model=PermutationImportanceResponse)
+async def get_permutation_importance(
+    request: Request,
+    model: str = Depends(model_param),
+    repeats: int = Query(N_REPEATS, ge=1, le=100),
+    max_rows: int = Query(MAX_ROWS, ge=100),
+    wait: bool = Query(True),
+):
+    """Drop in ROC AUC per shuffled feature over the dataset, for any model.
+
+    Computed in the compute pool on first use; ``wait=false`` returns 202
+    and the job until it is done.
+    """
+    # Every value from the dataset size up means all rows: one cache entry and job
+    max_rows = min(max_rows, DATASET_SIZE)
+    if not dataset_permutation_importance.is_cached(model, repeats, max_rows):
+        job = submit_permutation_importance(model, repeats, max_rows, result_url(request))
+        pending, _ = await _job_result(job, wait)
+        if pending is not None:
+            return pending
+    result = dataset_permutation_importance(model, repeats, max_rows)
+    return PermutationImportanceResponse(model=model, **result)
 
 
 @router.get("/shap/{txn_id}", response_model=TransactionShapResponse)
-def get_txn_shap(
+async def get_txn_shap(
     txn_id: str,
-    model: str = Query("xgboost", pattern="^(xgboost|tensorflow)$"),
+    request: Request,
+    model: str = Depends(model_param),
+    wait: bool = Query(True),
 ):
-    """Return SHAP explanation for a single transaction."""
-    txns, _, _ = _get_dataset(model)
-    index = next((i for i, t in enumerate(txns) if t["id"] == txn_id), None)
+    """Return SHAP explanation for a single transaction.
+
+    KernelExplainer models explain the row in the compute pool; with
+    ``wait=false`` an unfinished explanation returns 202 and the job.
+    """
+    store = await run_in_threadpool(_get_dataset, model)
+    index = store.index_of(txn_id)
     if index is None:
         raise HTTPException(status_code=404, detail=f"Transaction {txn_id} not found")
-    result = get_transaction_shap(model_name=model, txn_index=index)
+    features = features_from_records([store.row(index)], dtype=np.float64)[0]
+    if offloads_shap(model):
+        job = submit_transaction_shap(model, txn_id, features, result_url(request))
+        pending, result = await _job_result(job, wait)
+        if pending is not None:
+            return pending
+    else:
+        result = await run_in_threadpool(get_transaction_shap, model, txn_id, features)
     return TransactionShapResponse(
         base_value=result["base_value"],
         output_value=result["output_value"],
         features=[ShapFeatureItem(**f) for f in result["features"]],
     )
+
+
+def _batch_features(req: ShapBatchRequest, model: str) -> tuple[np.ndarray, list, list[str]]:
+    """Feature rows to explain, their ids, and requested ids not in the dataset."""
+    if req.ids is None:
+        records = [t.model_dump() for t in req.transactions]
+        online = None
+        if any(r["card_id"] is not None for r in records):
+            from ..ml.feature_store import get_feature_store
+            online = get_feature_store()
+        X = features_from_records(records, dtype=np.float64, online=online, record=False)
+        return X, [r["id"] for r in records], []
+
+    store = _get_dataset(model)
+    rows, ids, missing = [], [], []
+    for txn_id in req.ids:
+        index = store.index_of(txn_id)
+        if index is None:
+            missing.append(txn_id)
+        else:
+            rows.append(index)
+            ids.append(txn_id)
+    if not rows:
+        raise HTTPException(status_code=404, detail="None of the transactions were found")
+    records = store.rows(np.array(rows, dtype=np.intp))
+    return features_from_records(records, dtype=np.float64), ids, missing
+
+
+@router.post("/shap/batch", response_model=ShapBatchResponse)
+async def explain_transactions(
+    req: ShapBatchRequest,
+    request: Request,
+    wait: bool = Query(True),
+):
+    """SHAP breakdown of many transactions, given by id or as raw transactions.
+
+    XGBoost models are explained by one native TreeSHAP call over all rows;
+    KernelExplainer models run as one batched job in the compute pool, and
+    with ``wait=false`` an unfinished batch returns 202 and the job.
+    """
+    model = require_model(req.model)
+    X, ids, missing = await run_in_threadpool(_batch_features, req, model)
+    if offloads_shap(model):
+        pending, result = await _job_result(submit_batch_shap(model, X, result_url(request)), wait)
+        if pending is not None:
+            return pending
+    else:
+        result = await run_in_threadpool(explain_batch, model, X)
+    values, base_value = result
+    body = await run_in_threadpool(
+        lambda: dump_object(ShapBatchResponse, {
+            "model": model, "ids": ids, "missing": missing,
+            **batch_explanation(X, values, base_value),
+        })
+    )
+    return JSONBytesResponse(body)
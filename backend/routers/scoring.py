@@ -0,0 +1,101 @@
+import os
+from functools import partial
+
+from fastapi import APIRouter
+
+from ..ml.batcher import MicroBatcher
+from ..ml.feature_store import get_feature_store
+from ..ml.model import FLAG_THRESHOLD, features_from_records, round_scores, score_records
+from ..ml.registry import agreement_stats, list_models, score_models
+from ..schemas import (
+    AgreementStats, BatcherStats, CompareRequest, CompareResponse, CompareResult,
+    ScoreRequest, ScoreResponse, ScoreResult,
+)
+from .transactions import require_model
+
+router = APIRouter(prefix="/api")
+
+MAX_BATCH_SIZE = int(os.environ.get("FRAUD_SCORE_MAX_BATCH", "64"))
+MAX_WAIT_MS = float(os.environ.get("FRAUD_SCORE_MAX_WAIT_MS", "2"))
+
+_batchers: dict[str, MicroBatcher] = {}
+
+
+def _get_batcher(model_name: str) -> MicroBatcher:
+    """One micro-batcher per model, created on first use."""
+    batcher = _batchers.get(model_name)
+    if batcher is None:
+        batcher = MicroBatcher(
+            partial(score_records, model_name=model_name),
+            max_batch_size=MAX_BATCH_SIZE,
+            max_wait_ms=MAX_WAIT_MS,
+        )
+        _batchers[model_name] = batcher
+    return batcher
+
+
+async def shutdown_batchers() -> None:
+    """Stop all batcher workers (called from the app lifespan)."""
+    for batcher in _batchers.values():
+        await batcher.close()
+
+
+@router.post("/score", response_model=ScoreResponse)
+async def score_transactions(req: ScoreRequest):
+    """Score one or a few transactions through the per-model micro-batcher."""
+    records = [t.model_dump() for t in req.transactions]
+    scores = await _get_batcher(require_model(req.model)).submit(records)
+    return ScoreResponse(
+        model=req.model,
+        results=[
+            ScoreResult(id=r["id"], risk_score=s, flagged=s > FLAG_THRESHOLD)
+            for r, s in zip(records, scores)
+        ],
+    )
+
+
+@router.post("/score/compare", response_model=CompareResponse)
+def compare_models(req: CompareRequest):
+    """Score transactions with a champion and its challengers side by side.
+
+    Features are extracted once and shared (with ``cardId``, read from the
+    online feature store); the models run in parallel threads. Agreement
+    stats compare each challenger with the champion.
+    """
+    model_ids = req.models or [spec.id for spec in list_models()]
+    for model_id in [req.champion, *model_ids]:
+        require_model(model_id)
+    if req.champion not in model_ids:
+        model_ids = [req.champion, *model_ids]
+
+    records = [t.model_dump() for t in req.transactions]
+    # Card features are read from the online store, not recorded: comparing
+    # a transaction does not make it part of the card's history
+    online = get_feature_store() if any(r["card_id"] is not None for r in records) else None
+    probs = score_models(features_from_records(records, online=online, record=False), model_ids)
+    scores = {m: round_scores(p) for m, p in probs.items()}
+    return CompareResponse(
+        champion=req.champion,
+        models=model_ids,
+        results=[
+            CompareResult(
+                id=r["id"],
+                scores={m: scores[m][i] for m in model_ids},
+                flagged={m: scores[m][i] > FLAG_THRESHOLD for m in model_ids},
+            )
+            for i, r in enumerate(records)
+        ],
+        agreement=[
+            AgreementStats(**a)
+            for a in agreement_stats(scores, req.champion, FLAG_THRESHOLD)
+        ],
+    )
+
+
+@router.get("/score/stats", response_model=list[BatcherStats])
+def get_score_stats():
+    """Queue depth, batch sizes, latency percentiles and throughput per model."""
+    return [
+        BatcherStats(model=name, **batcher.stats())
+        for name, batcher in sorted(_batchers.items())
+    ]
@@ -0,0 +1,69 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from .. import telemetry
+from ..ml import cache as disk_cache
+from ..ml.cache import _file_digest
+from ..ml.jobs import scheduler
+from ..ml.model import reference_arrays
+from ..ml.registry import cache_stats
+from ..ml.shap_explain import _explain_transaction
+from ..serialize import response_cache
+
+router = APIRouter()
+
+# Caches outside model_cache, by the name they are reported under
+_LRU_CACHES = {
+    "model.reference_arrays": reference_arrays,
+    "shap_explain._explain_transaction": _explain_transaction,
+    "cache._file_digest": _file_digest,
+}
+
+
+def _caches() -> dict[str, dict]:
+    caches = cache_stats()
+    for name, fn in _LRU_CACHES.items():
+        info = fn.cache_info()
+        caches[name] = {"hits": info.hits, "misses": info.misses, "entries": info.currsize}
+    caches["response_cache"] = {
+        "hits": response_cache.hits, "misses": response_cache.misses, "entries": len(response_cache),
+    }
+    caches["disk_cache"] = {**disk_cache.stats, "entries": None}
+    return caches
+
+
+def _cache_samples(field: str):
+    return [
+        ({"cache": name}, stats[field])
+        for name, stats in _caches().items() if stats[field] is not None
+    ]
+
+
+def _job_samples():
+    counts = dict.fromkeys(("queued", "running", "done", "failed"), 0)
+    for job in scheduler.jobs():
+        counts[job.status] += 1
+    return [({"status": status}, n) for status, n in counts.items()]
+
+
+telemetry.register_collector(
+    "fraud_cache_hits_total", "counter", "Cache lookups served from the cache.",
+    lambda: _cache_samples("hits"),
+)
+telemetry.register_collector(
+    "fraud_cache_misses_total", "counter", "Cache lookups that computed the value.",
+    lambda: _cache_samples("misses"),
+)
+telemetry.register_collector(
+    "fraud_cache_entries", "gauge", "Entries held by an in-memory cache.",
+    lambda: _cache_samples("entries"),
+)
+telemetry.register_collector(
+    "fraud_compute_jobs", "gauge", "Compute jobs in this worker's history by status.", _job_samples,
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    return PlainTextResponse(telemetry.render(), media_type=telemetry.CONTENT_TYPE)
@@ -1,48 +1,145 @@
-from functools import lru_cache
+from datetime import date, datetime, timezone
 
-from fastapi import APIRouter, Query
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from ..data.generator import generate_transactions
-from ..ml.model import predict_risk_scores
-from ..schemas import Transaction, TransactionsResponse
+from ..data.constants import DATASET_SEED, DATASET_SIZE
+from ..data.index import SORT_KEYS, TransactionFilter, TransactionIndex
+from ..data.store import TransactionStore
+from ..ml.metrics import ScoreIndex
+from ..ml.model import FLAG_THRESHOLD, predict_proba, reference_arrays, round_scores
+from ..ml.registry import current_revision, is_registered, model_cache
+from ..ml.reload import add_warmer
+from ..ml.shared import model_arrays
+from ..schemas import TransactionsResponse
+from ..serialize import JSONBytesResponse, dump_transactions, response_cache
+from ..telemetry import span
 
 router = APIRouter(prefix="/api")
 
 
-@lru_cache(maxsize=2)
-def _get_dataset(model_name: str = "xgboost") -> tuple[list[dict], list[float], list[bool]]:
-    """Generate and score transactions once per model, cache for the server session."""
-    df = generate_transactions(count=500, seed=42)
-    scores = predict_risk_scores(df, model_name=model_name)
-
-    txns = []
-    for _, row in df.iterrows():
-        score = scores[len(txns)]
-        txns.append({
-            "id": row["id"],
-            "amount": row["amount"],
-            "merchant": row["merchant"],
-            "city": row["city"],
-            "card_type": row["card_type"],
-            "hour": row["hour"],
-            "velocity": row["velocity"],
-            "dist_from_home": row["dist_from_home"],
-            "is_fraud": row["is_fraud"],
-            "risk_score": score,
-            "date": row["date"],
-            "flagged": score > 0.6,
-        })
-
-    y_true = [t["is_fraud"] for t in txns]
-    return txns, scores, y_true
+def require_model(model_name: str) -> str:
+    """Reject ids that are not in the model registry with a 404."""
+    if not is_registered(model_name):
+        raise HTTPException(status_code=404, detail=f"Model {model_name} is not registered")
+    return model_name
+
+
+def date_bound(name: str, value: str | None, end: bool = False) -> np.datetime64 | None:
+    """Parse an ISO-8601 date or datetime query parameter (422 if invalid).
+
+    A date-only upper bound (``end``) covers that whole day: at the
+    dataset's one-second resolution, ``<= day 23:59:59`` is ``< day + 1``.
+    """
+    if value is None:
+        return None
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        day = None
+    if day is not None:
+        bound = np.datetime64(day, "s")
+        return bound + np.timedelta64(1, "D") - np.timedelta64(1, "s") if end else bound
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=422, detail=f"{name} must be an ISO-8601 date or datetime, got {value!r}"
+        )
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(moment, "s")
+
+
+def model_param(model: str = Query("xgboost")) -> str:
+    """``?model=`` query dependency accepting any registered model id."""
+    return require_model(model)
+
+
+# Per-model caches below are keyed by model id and revision, so a hot
+# reload warms fresh entries and evicts the old ones.
+@model_cache
+def _get_dataset(model_name: str = "xgboost") -> TransactionStore:
+    """Score the shared reference dataset once per model, cache for the server session.
+
+    Scores are also persisted on disk per model artifact, so restarts with
+    unchanged artifacts skip loading and running the model. Every model's
+    store shares the reference columns; in shared mode so does every worker.
+    """
+    with span("dataset_build"):
+        arrays = reference_arrays()
+        scores = model_arrays(
+            "scores", model_name,
+            lambda: {"scores": round_scores(predict_proba(arrays["features"], model_name=model_name))},
+            count=DATASET_SIZE, seed=DATASET_SEED,
+        )["scores"]
+        return TransactionStore.from_arrays(arrays, scores, flag_threshold=FLAG_THRESHOLD)
+
+
+@model_cache
+def _get_score_index(model_name: str = "xgboost") -> ScoreIndex:
+    """Sorted-score index over the cached dataset, built once per model."""
+    store = _get_dataset(model_name)
+    return ScoreIndex(store.columns["is_fraud"], store.columns["risk_score"])
+
+
+@model_cache
+def _get_transaction_index(model_name: str = "xgboost") -> TransactionIndex:
+    """Sort orders over the cached dataset, built once per model."""
+    return TransactionIndex(_get_dataset(model_name))
+
+
+@add_warmer
+def _warm_dataset(model_name: str) -> None:
+    """Build the scored dataset and its indexes ahead of a model swap."""
+    _get_score_index(model_name).curve()
+    _get_transaction_index(model_name)
 
 
 @router.get("/transactions", response_model=TransactionsResponse)
-def get_transactions(model: str = Query("xgboost", pattern="^(xgboost|tensorflow)$")):
-    """Return all cached transactions with risk scores from the selected model."""
-    txns, _, _ = _get_dataset(model)
-    total_fraud = sum(1 for t in txns if t["is_fraud"])
-    return TransactionsResponse(
-        transactions=[Transaction(**t) for t in txns],
-        total_fraud=total_fraud,
+def get_transactions(
+    model: str = Depends(model_param),
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1, le=10_000),
+    sort: str | None = Query(None, pattern=f"^-?({'|'.join(SORT_KEYS)})$"),
+    flagged: bool | None = None,
+    is_fraud: bool | None = None,
+    merchant: str | None = None,
+    city: str | None = None,
+    min_score: float | None = Query(None, ge=0, le=1),
+    max_score: float | None = Query(None, ge=0, le=1),
+    date_from: str | None = None,
+    date_to: str | None = None,
+):
+    """Return cached transactions with risk scores from the selected model.
+
+    Without query parameters this is every transaction in dataset order;
+    ``sort`` takes a column name, prefixed with ``-`` for descending. The
+    body is written straight from the store's columns and cached, rather
+    than built from one ``Transaction`` model per row.
+    """
+    revision = current_revision(model)
+    f = TransactionFilter(
+        flagged=flagged, is_fraud=is_fraud, merchant=merchant, city=city,
+        min_score=min_score, max_score=max_score,
+        date_from=date_bound("date_from", date_from),
+        date_to=date_bound("date_to", date_to, end=True),
     )
+
+    def build() -> bytes:
+        store = _get_dataset(model)
+        index = _get_transaction_index(model)
+        descending = sort is not None and sort.startswith("-")
+        rows = index.query(
+            f, sort=sort.lstrip("-") if sort else None, descending=descending,
+            offset=offset, limit=limit,
+        )
+        return dump_transactions(
+            store, rows,
+            total_fraud=int(store.columns["is_fraud"].sum()),
+            total=index.count(f),
+        )
+
+    # Serialized once per model revision and query
+    key = (model, revision, "transactions", f, sort, offset, limit)
+    return JSONBytesResponse(response_cache.get_or_build(key, build))
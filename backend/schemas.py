@@ -1,6 +1,20 @@
-from pydantic import BaseModel, ConfigDict
+import time
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from pydantic.alias_generators import to_camel
 
+from .data.constants import BATCH_MAX_ROWS
+
+# How far ahead of the server's clock an event timestamp may be
+MAX_CLOCK_SKEW_SECONDS = 300
+
+
+def _check_timestamp(timestamp: float | None) -> float | None:
+    """Reject future timestamps, e.g. epoch milliseconds sent as seconds."""
+    if timestamp is not None and timestamp > time.time() + MAX_CLOCK_SKEW_SECONDS:
+        raise ValueError("timestamp is in the future; expected epoch seconds")
+    return timestamp
+
 
 class CamelModel(BaseModel):
     """Base model that serializes field names to camelCase."""
@@ -28,11 +42,15 @@ class Transaction(CamelModel):
 class TransactionsResponse(CamelModel):
     transactions: list[Transaction]
     total_fraud: int
+    total: int
 
 
 class EvaluateRequest(CamelModel):
     threshold: float
     model: str = "xgboost"
+    # "live" evaluates labeled outcomes posted to /api/model/outcomes
+    source: str = Field("dataset", pattern="^(dataset|live)$")
+    window_seconds: int | None = Field(None, ge=1)
 
 
 class EvaluateResponse(CamelModel):
@@ -55,11 +73,30 @@ class ROCPoint(CamelModel):
     f1: float
 
 
+class CurveSummary(CamelModel):
+    auc_roc: float | None
+    auc_pr: float | None
+
+
 class FeatureImportanceItem(CamelModel):
     feature: str
     importance: float
 
 
+class PermutationImportanceItem(CamelModel):
+    feature: str
+    importance: float
+    std: float
+
+
+class PermutationImportanceResponse(CamelModel):
+    model: str
+    baseline_auc: float
+    rows: int
+    repeats: int
+    features: list[PermutationImportanceItem]
+
+
 class ShapFeatureItem(CamelModel):
     feature: str
     raw_value: float
@@ -70,3 +107,199 @@ class TransactionShapResponse(CamelModel):
     base_value: float
     output_value: float
     features: list[ShapFeatureItem]
+
+
+class ScoreTransactionInput(CamelModel):
+    """A transaction to score.
+
+    Either give ``velocity`` and ``dist_from_home`` directly, or a
+    ``card_id`` with the transaction's location (and optionally its epoch
+    ``timestamp``, default now) to derive them from the online feature
+    store.
+    """
+    id: str | None = None
+    amount: float
+    merchant: str
+    city: str
+    card_type: str | None = None
+    hour: int = Field(ge=0, le=23)
+    velocity: int | None = None
+    dist_from_home: float | None = None
+    card_id: str | None = None
+    timestamp: float | None = None
+    lat: float | None = Field(None, ge=-90, le=90)
+    lon: float | None = Field(None, ge=-180, le=180)
+
+    _check_timestamp = field_validator("timestamp")(_check_timestamp)
+
+    @model_validator(mode="after")
+    def _check_feature_source(self):
+        if self.card_id is not None:
+            if self.lat is None or self.lon is None:
+                raise ValueError("lat and lon are required with cardId")
+        elif self.velocity is None or self.dist_from_home is None:
+            raise ValueError("velocity and distFromHome are required without cardId")
+        return self
+
+
+class ShapBatchRequest(CamelModel):
+    """Transactions to explain: dataset ids, or raw transactions as for scoring.
+
+    Raw transactions with a ``card_id`` read velocity and distance from the
+    online feature store without being recorded in it.
+    """
+    model: str = "xgboost"
+    ids: list[str] | None = Field(None, min_length=1, max_length=BATCH_MAX_ROWS)
+    transactions: list[ScoreTransactionInput] | None = Field(None, min_length=1, max_length=BATCH_MAX_ROWS)
+
+    @model_validator(mode="after")
+    def _check_source(self):
+        if (self.ids is None) == (self.transactions is None):
+            raise ValueError("give exactly one of ids and transactions")
+        return self
+
+
+class ShapBatchResponse(CamelModel):
+    """SHAP breakdown of many transactions, column-oriented.
+
+    ``raw_values[f][i]`` and ``shap_values[f][i]`` are feature ``f`` of the
+    i-th explained transaction; ``features`` names the rows.
+    """
+    model: str
+    ids: list[str | None]
+    missing: list[str]
+    base_value: float
+    features: list[str]
+    output_values: list[float]
+    raw_values: list[list[float]]
+    shap_values: list[list[float]]
+
+
+class ScoreRequest(CamelModel):
+    transactions: list[ScoreTransactionInput] = Field(min_length=1, max_length=1000)
+    model: str = "xgboost"
+
+
+class ScoreResult(CamelModel):
+    id: str | None
+    risk_score: float
+    flagged: bool
+
+
+class ScoreResponse(CamelModel):
+    model: str
+    results: list[ScoreResult]
+
+
+class BatcherStats(CamelModel):
+    model: str
+    queue_depth: int
+    requests: int
+    batches: int
+    rows: int
+    mean_batch_size: float
+    max_batch_size: int
+    batch_size_histogram: dict[str, int]
+    latency_p50_ms: float
+    latency_p99_ms: float
+    throughput_rows_per_sec: float
+
+
+class ModelInfo(CamelModel):
+    id: str
+    family: str
+    version: str | None
+    revision: int
+    artifacts: list[str]
+    artifact_hash: str
+
+
+class CompareRequest(CamelModel):
+    transactions: list[ScoreTransactionInput] = Field(min_length=1, max_length=1000)
+    # Defaults to every registered model
+    models: list[str] | None = None
+    champion: str = "xgboost"
+
+
+class CompareResult(CamelModel):
+    id: str | None
+    scores: dict[str, float]
+    flagged: dict[str, bool]
+
+
+class AgreementStats(CamelModel):
+    model: str
+    champion: str
+    flag_agreement: float
+    flagged_only_by_champion: int
+    flagged_only_by_challenger: int
+    mean_abs_diff: float
+    max_abs_diff: float
+    correlation: float | None
+
+
+class CompareResponse(CamelModel):
+    champion: str
+    models: list[str]
+    results: list[CompareResult]
+    agreement: list[AgreementStats]
+
+
+class ReloadReport(CamelModel):
+    model: str
+    previous_revision: int
+    revision: int
+    artifact_hash: str
+    warm_seconds: float
+    swap_ms: float
+    evicted: int
+    reloaded_at: str
+
+
+class FeatureStoreStats(CamelModel):
+    cards: int
+    capacity: int
+    memory_bytes: int
+    window_seconds: int
+    buckets: int
+    ttl_seconds: float
+    snapshot_path: str | None
+
+
+class Outcome(CamelModel):
+    id: str | None = None
+    risk_score: float = Field(ge=0, le=1)
+    is_fraud: bool
+    timestamp: float | None = None
+
+    _check_timestamp = field_validator("timestamp")(_check_timestamp)
+
+
+class OutcomesRequest(CamelModel):
+    model: str = "xgboost"
+    outcomes: list[Outcome] = Field(min_length=1, max_length=100_000)
+
+
+class LiveMetricsStats(CamelModel):
+    model: str
+    bins: int
+    slice_seconds: int
+    window_seconds: int
+    total: int
+    total_fraud: int
+    window_total: int
+    window_fraud: int
+
+
+class JobInfo(CamelModel):
+    id: str
+    kind: str
+    model: str | None
+    # queued | running | done | failed
+    status: str
+    submitted_at: str
+    started_at: str | None
+    finished_at: str | None
+    seconds: float | None
+    error: str | None
+    result_url: str | None
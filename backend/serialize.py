@@ -0,0 +1,135 @@
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+from .data.store import FIELDS, TransactionStore
+from .ml.registry import track_cache
+from .schemas import Transaction
+from .telemetry import span
+
+# Budget for cached response bodies across all models
+RESPONSE_CACHE_BYTES = int(os.environ.get("FRAUD_RESPONSE_CACHE_MB", "64")) * 1024 * 1024
+
+TRANSACTION_KEYS = tuple(Transaction.model_fields[name].alias for name in FIELDS)
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+
+class JSONBytesResponse(Response):
+    """Response for a body that is already serialized JSON."""
+
+    media_type = "application/json"
+
+
+def _aliases(schema: type[BaseModel]) -> list[tuple[str, str, bool]]:
+    return [
+        (name, field.alias or name, field.annotation is float)
+        for name, field in schema.model_fields.items()
+    ]
+
+
+def dump_items(schema: type[BaseModel], items: list[dict]) -> bytes:
+    """Serialize dicts as a JSON list of ``schema`` objects.
+
+    Produces the same bytes as returning ``[schema(**item) ...]`` with
+    ``response_model=list[schema]``: keys are the camelCase aliases in
+    field order and float fields are written as floats, without building
+    a model per item. Only for flat schemas of scalar fields.
+    """
+    fields = _aliases(schema)
+    with span("serialize"):
+        return orjson.dumps(
+            [
+                {alias: float(item[name]) if is_float else item[name] for name, alias, is_float in fields}
+                for item in items
+            ],
+            option=_OPTIONS,
+        )
+
+
+def dump_object(schema: type[BaseModel], obj: dict) -> bytes:
+    """Serialize a dict as one ``schema`` object under its camelCase aliases.
+
+    NumPy arrays in ``obj`` are written natively, so large numeric fields
+    never become Python lists.
+    """
+    with span("serialize"):
+        return orjson.dumps({alias: obj[name] for name, alias, _ in _aliases(schema)}, option=_OPTIONS)
+
+
+def dump_transactions(store: TransactionStore, rows, total_fraud: int, total: int) -> bytes:
+    """``TransactionsResponse`` JSON straight from the store's columns."""
+    with span("serialize"):
+        return orjson.dumps(
+            {
+                "transactions": store.rows(rows, keys=TRANSACTION_KEYS),
+                "totalFraud": total_fraud,
+                "total": total,
+            },
+            option=_OPTIONS,
+        )
+
+
+class ResponseCache:
+    """LRU of serialized response bodies, bounded by total bytes.
+
+    Keys start with ``(model_id, revision)``, so a model reload never
+    serves an old body and ``evict_stale`` frees the old revision's.
+    """
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def pop(self, key: Hashable, default=None):
+        with self._lock:
+            body = self._entries.pop(key, None)
+            if body is None:
+                return default
+            self.nbytes -= len(body)
+            return body
+
+    def get_or_build(self, key: Hashable, build: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+            self.misses += 1
+        body = build()
+        if len(body) > self.max_bytes:
+            return body
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = body
+                self.nbytes += len(body)
+            while self.nbytes > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self.nbytes -= len(old)
+        return body
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+response_cache = ResponseCache()
+track_cache(response_cache)
@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+# Set to 0 to stop recording spans, request latencies and batch sizes; the
+# hot paths then cost one flag check. Per-request profiling still works.
+ENABLED = os.environ.get("FRAUD_TELEMETRY", "1") != "0"
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+ROW_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (labels, value) samples of one metric family, produced at scrape time
+Samples = Iterable[tuple[dict[str, str], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Prometheus histogram with fixed buckets, one series per label tuple."""
+
+    def __init__(self, name: str, help: str, buckets: tuple, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = labels
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(series):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = _labels(self.labels, labels, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+_histograms: list[Histogram] = []
+_collectors: list[tuple[str, str, str, Callable[[], Samples]]] = []
+
+
+def histogram(name: str, help: str, buckets: tuple, labels: tuple[str, ...] = ()) -> Histogram:
+    """Create a histogram that is included in ``render()``."""
+    h = Histogram(name, help, buckets, labels)
+    _histograms.append(h)
+    return h
+
+
+def register_collector(name: str, kind: str, help: str, collect: Callable[[], Samples]) -> None:
+    """Add a counter or gauge family whose samples ``collect()`` reads at scrape time.
+
+    For values something already tracks (cache statistics, job states), so
+    nothing extra runs on the request path.
+    """
+    _collectors.append((name, kind, help, collect))
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for h in _histograms:
+        lines.extend(h.render())
+    for name, kind, help, collect in _collectors:
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        for labels, value in collect():
+            lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_SECONDS = histogram(
+    "fraud_http_request_duration_seconds", "Request latency by route template.",
+    LATENCY_BUCKETS, ("method", "route", "status"),
+)
+STAGE_SECONDS = histogram(
+    "fraud_stage_duration_seconds", "Time spent in an instrumented stage; stages nest.",
+    LATENCY_BUCKETS, ("stage",),
+)
+INFERENCE_ROWS = histogram(
+    "fraud_inference_batch_rows", "Rows per predict_proba call.", ROW_BUCKETS, ("model",),
+)
+
+# Stage -> [seconds, calls] for the request being profiled, if any
+_profile: ContextVar[dict[str, list] | None] = ContextVar("profile", default=None)
+
+_NO_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("stage", "profile", "start")
+
+    def __init__(self, stage: str, profile: dict | None):
+        self.stage = stage
+        self.profile = profile
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        seconds = time.perf_counter() - self.start
+        if ENABLED:
+            STAGE_SECONDS.observe(seconds, self.stage)
+        if self.profile is not None:
+            entry = self.profile.setdefault(self.stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+        return False
+
+
+def span(stage: str):
+    """Context manager timing a stage into ``fraud_stage_duration_seconds``
+    and the current request's profile. A shared no-op when neither is on."""
+    profile = _profile.get()
+    if profile is None and not ENABLED:
+        return _NO_SPAN
+    return _Span(stage, profile)
+
+
+def observe_batch(model_name: str, rows: int) -> None:
+    if ENABLED:
+        INFERENCE_ROWS.observe(rows, model_name)
+
+
+def server_timing(profile: dict[str, list], total: float) -> str:
+    """``Server-Timing`` header value: each stage's total ms and call count."""
+    parts = [
+        f'{stage};dur={seconds * 1000:.3f};desc="{calls} call{"s" if calls != 1 else ""}"'
+        for stage, (seconds, calls) in profile.items()
+    ]
+    parts.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(parts)
+
+
+def _wants_profile(query_string: bytes) -> bool:
+    return b"profile=" in query_string and any(
+        part in (b"profile=1", b"profile=true") for part in query_string.split(b"&")
+    )
+
+
+class TelemetryMiddleware:
+    """ASGI middleware recording request latency per route template.
+
+    With ``?profile=1`` the request's spans are also collected and returned
+    as a ``Server-Timing`` header. Stages run in the compute pool are not
+    seen; the time the request waited for them shows as ``job_wait``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        profile = {} if _wants_profile(scope["query_string"]) else None
+        if profile is None and not ENABLED:
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile is not None:
+                    value = server_timing(profile, time.perf_counter() - start)
+                    headers = [*message.get("headers", ()), (b"server-timing", value.encode())]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        token = _profile.set(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+            if ENABLED:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], route, str(status))
@@ -18,6 +18,7 @@ export interface Transaction {
 export interface TransactionsResponse {
   transactions: Transaction[];
   totalFraud: number;
+  total: number;
 }
 
 export interface ModelMetrics {